@@ -0,0 +1,25 @@
+"""Replace a file in one step, so a crash or a failed write never leaves half of one behind.
+
+    with atomic_write(path, 'wb') as f:
+        f.write(data)
+
+The data goes to a temporary file next to `path`, which is moved over it only once the block
+finishes; if the block raises, the temporary file is removed and `path` is left as it was.
+"""
+import contextlib
+import os
+
+
+@contextlib.contextmanager
+def atomic_write(path, mode='w', **open_args):
+    tmp = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp, mode, **open_args) as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,149 @@
+"""Micro-benchmarks for the board rules.
+
+    python benchmark.py connect [--probes N] [--seed S]
+    python benchmark.py grid [--sizes WxH ...] [--ops N] [--seed S]
+    python benchmark.py generate [--boards N] [--seed S]
+"""
+import argparse
+import random
+import time
+
+import generator
+from board import ANIMAL_IDS, ArrayBoard, Board, BOARD_HEIGHT, BOARD_WIDTH, LEVEL_MAX
+
+# Fraction of tiles left on the board for each benchmarked stage
+STAGES = [('full', 1.0), ('half-cleared', 0.5), ('nearly-empty', 0.1)]
+
+
+def make_board(keep, rng):
+    """Fresh board with whole animal pairs cleared until about `keep` of the tiles remain"""
+    board = Board(ANIMAL_IDS, rng=rng)
+    pos = {}
+    for y in range(board.height):
+        for x in range(board.width):
+            if board.grid[y][x]:
+                pos.setdefault(board.grid[y][x], []).append((y, x))
+    pairs = [cells[i:i+2] for cells in pos.values() for i in range(0, len(cells)-1, 2)]
+    rng.shuffle(pairs)
+    total = sum(len(p) for p in pairs)
+    while pairs and sum(len(p) for p in pairs) > total * keep:
+        (y1, x1), (y2, x2) = pairs.pop()
+        board.remove(y1, x1, y2, x2)
+    return board
+
+
+def click_pairs(board, count, rng):
+    """Random same-animal click pairs, the only ones that reach the path search"""
+    pos = {}
+    for y in range(board.height):
+        for x in range(board.width):
+            if board.grid[y][x]:
+                pos.setdefault(board.grid[y][x], []).append((y, x))
+    groups = [cells for cells in pos.values() if len(cells) > 1]
+    out = []
+    for _ in range(count):
+        a, b = rng.sample(rng.choice(groups), 2)
+        out.append((a[0], a[1], b[0], b[1]))
+    return out
+
+
+def time_calls(fn, probes):
+    start = time.perf_counter()
+    for probe in probes:
+        fn(*probe)
+    return (time.perf_counter() - start) / len(probes) * 1e6
+
+
+def bench_connect(args):
+    rng = random.Random(args.seed)
+    print(f"{'board':<14}{'connect us':>12}{'bfs us':>10}{'speedup':>9}{'found':>8}")
+    for name, keep in STAGES:
+        board = make_board(keep, rng)
+        probes = click_pairs(board, args.probes, rng)
+        for probe in probes:
+            fast, slow = board._route(*probe), board._bfs(*probe)
+            if bool(fast) != bool(slow) or (fast and len(fast) != len(slow)):
+                raise AssertionError(f'connect disagrees with _bfs on {probe}: {fast} vs {slow}')
+        found = sum(1 for probe in probes if board._route(*probe))
+        t_fast = time_calls(board._route, probes)
+        t_slow = time_calls(board._bfs, probes)
+        print(f'{name:<14}{t_fast:>12.1f}{t_slow:>10.1f}{t_slow/t_fast:>8.1f}x{found:>8}')
+
+
+def bench_grid(args):
+    print(f"{'size':<10}{'board':<12}{'populate ms':>12}{'complete us':>13}{'alter us':>10}{'shuffle us':>12}")
+    for size in args.sizes:
+        width, height = map(int, size.lower().split('x'))
+        for cls in (Board, ArrayBoard):
+            start = time.perf_counter()
+            board = cls(ANIMAL_IDS, width, height, random.Random(args.seed))
+            t_populate = (time.perf_counter() - start) * 1e3
+
+            start = time.perf_counter()
+            for _ in range(args.ops):
+                board.is_complete()
+            t_complete = (time.perf_counter() - start) / args.ops * 1e6
+
+            rng = random.Random(args.seed)
+            cells = [cell for cell, _ in board.tiles()]
+            rng.shuffle(cells)
+            clicks = [(cells[i], cells[i+1]) for i in range(0, min(len(cells), 2*args.ops) - 1, 2)]
+            start = time.perf_counter()
+            for n, ((y1, x1), (y2, x2)) in enumerate(clicks):
+                board.remove(y1, x1, y2, x2)
+                board.alter(y1, x1, y2, x2, n % 4 + 2)
+            t_alter = (time.perf_counter() - start) / len(clicks) * 1e6
+
+            board._shuffle_tiles()  # keep one-off setup (NumPy's first permutation) out of the timing
+            start = time.perf_counter()
+            for _ in range(args.ops):
+                board._shuffle_tiles()
+            t_shuffle = (time.perf_counter() - start) / args.ops * 1e6
+            print(f'{size:<10}{cls.__name__:<12}{t_populate:>12.2f}{t_complete:>13.1f}{t_alter:>10.1f}{t_shuffle:>12.1f}')
+
+
+def bench_generate(args):
+    print(f"{'level':<7}{'random ms':>11}{'solvable ms':>13}{'solved %':>10}{'reshuffle ms':>14}")
+    for level in range(1, LEVEL_MAX + 1):
+        rng = random.Random(args.seed)
+        start = time.perf_counter()
+        boards = [Board(ANIMAL_IDS, rng=rng) for _ in range(args.boards)]
+        t_random = (time.perf_counter() - start) / args.boards * 1e3
+
+        start = time.perf_counter()
+        solved = sum(generator.make_solvable(board, level) for board in boards)
+        t_solvable = t_random + (time.perf_counter() - start) / args.boards * 1e3
+
+        for board in boards:
+            cells = [cell for cell, _ in board.tiles()]
+            for a, b in zip(cells[::3], cells[1::3]):
+                board.remove(*a, *b)
+        start = time.perf_counter()
+        for board in boards:
+            generator.reshuffle(board, level)
+        t_reshuffle = (time.perf_counter() - start) / args.boards * 1e3
+        print(f'{level:<7}{t_random:>11.2f}{t_solvable:>13.2f}{solved / args.boards * 100:>10.1f}{t_reshuffle:>14.2f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest='bench', required=True)
+    p = sub.add_parser('connect', help='line-scan connector vs. legacy BFS on random click pairs')
+    p.add_argument('--probes', type=int, default=2000)
+    p.add_argument('--seed', type=int, default=0)
+    p.set_defaults(func=bench_connect)
+    p = sub.add_parser('grid', help='list-backed Board vs. NumPy ArrayBoard at several board sizes')
+    p.add_argument('--sizes', nargs='+', default=[f'{BOARD_WIDTH}x{BOARD_HEIGHT}', '100x60', '400x240'])
+    p.add_argument('--ops', type=int, default=200)
+    p.add_argument('--seed', type=int, default=0)
+    p.set_defaults(func=bench_grid)
+    p = sub.add_parser('generate', help='random fill vs. solvable-by-construction deal, per level')
+    p.add_argument('--boards', type=int, default=200)
+    p.add_argument('--seed', type=int, default=0)
+    p.set_defaults(func=bench_generate)
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
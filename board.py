@@ -0,0 +1,495 @@
+"""Board rules for Matching Animals: tile layout, path finding, gravity and shuffles.
+
+Nothing in here touches pygame, so boards can be built and played headlessly.
+"""
+import collections
+import itertools
+import random
+
+try:
+    import numpy as np
+except ImportError:  # only ArrayBoard needs it
+    np = None
+
+from profiler import PROFILER
+
+BOARD_WIDTH = 14
+BOARD_HEIGHT = 9
+NUM_ANIMALS_ON_BOARD = 26
+NUM_SAME_ANIMALS = 4
+LEVEL_MAX = 5
+ANIMAL_IDS = range(1, 48)  # the icons in animal_icon/, for boards dealt without the game
+LEGACY_BFS = False  # route every path query through the old BFS, for cross-checking
+
+
+class MoveIndex:
+    """Per-animal tile positions of a Board plus the cache of currently connectable pairs.
+    Built on first query, then kept current by update()."""
+    def __init__(self, board):
+        self.board = board
+        self.positions = collections.defaultdict(set)
+        self._pairs = None
+
+    @property
+    def pairs(self):
+        if self._pairs is None:
+            self.rebuild()
+        return self._pairs
+
+    @property
+    def active(self):
+        return self._pairs is not None
+
+    def invalidate(self):
+        self._pairs = None
+
+    def rebuild(self):
+        self.positions.clear()
+        for cell, val in self.board.tiles():
+            self.positions[val].add(cell)
+        self._pairs = {(a, b) for a, b in self._candidates() if self.board._route(*a, *b)}
+        if PROFILER.enabled:
+            PROFILER.count('index rebuilds')
+
+    def update(self, changes):
+        """Apply {(y, x): (old, new)} cell changes, rechecking only pairs whose paths they can touch"""
+        if not self.active: return  # not built yet, the first query starts from scratch
+        if PROFILER.enabled:
+            PROFILER.count('index cells', len(changes))
+        for cell, (old, new) in changes.items():
+            if old:
+                self.positions[old].discard(cell)
+                if not self.positions[old]: del self.positions[old]
+            if new:
+                self.positions[new].add(cell)
+        pairs = self._pairs = {(a, b) for a, b in self._pairs if a not in changes and b not in changes}
+        # Emptied cells can only open paths and filled cells can only block them, so a pair
+        # only needs rechecking if a change in its direction lands inside its bands
+        opened = [cell for cell, (old, new) in changes.items() if old and not new]
+        closed = [cell for cell, (old, new) in changes.items() if new and not old]
+        for a, b in self._candidates():
+            if a in changes or b in changes:
+                if self.board._route(*a, *b):
+                    pairs.add((a, b))
+            elif (a, b) in pairs:
+                if any(self._crosses(a, b, cell) for cell in closed) and not self.board._route(*a, *b):
+                    pairs.discard((a, b))
+            elif any(self._crosses(a, b, cell) for cell in opened) and self.board._route(*a, *b):
+                pairs.add((a, b))
+
+    def _candidates(self):
+        for cells in self.positions.values():
+            yield from itertools.combinations(sorted(cells), 2)
+
+    @staticmethod
+    def _crosses(a, b, cell):
+        # A path bending at most twice between a and b stays inside the band of rows or the
+        # band of columns the two tiles span, so a change anywhere else cannot affect it.
+        (y1, x1), (y2, x2), (y, x) = a, b, cell
+        return min(y1, y2) <= y <= max(y1, y2) or min(x1, x2) <= x <= max(x1, x2)
+
+    def hint(self):
+        return list(min(self.pairs)) if self.pairs else []
+
+    def __len__(self):
+        return len(self.pairs)
+
+
+class Board:
+    def __init__(self, animal_ids, width=BOARD_WIDTH, height=BOARD_HEIGHT, rng=None):
+        self.width = width
+        self.height = height
+        self.rng = rng or random
+        self.grid = []
+        self._populate(animal_ids)
+        self.moves = MoveIndex(self)
+        self.version = 0  # bumped by every change to the grid, so stale analyses can be spotted
+
+    @classmethod
+    def from_grid(cls, grid, rng=None):
+        """Board holding a copy of an existing grid instead of a fresh random layout"""
+        board = cls.__new__(cls)
+        board.height, board.width = len(grid), len(grid[0])
+        board.rng = rng or random
+        board._set_grid(grid)
+        board.moves = MoveIndex(board)
+        board.version = 0
+        return board
+
+    def _set_grid(self, grid):
+        self.grid = [list(row) for row in grid]
+
+    def _populate(self, animal_ids):
+        ids = list(animal_ids)
+        self.rng.shuffle(ids)
+        ids = ids[:NUM_ANIMALS_ON_BOARD]
+        cells = (self.width-2) * (self.height-2)
+        # Whole sets of NUM_SAME_ANIMALS (cycling through the animals when the board needs more
+        # sets than there are animals), then pairs for the remainder, so every count is even
+        sets = [ids[i % len(ids)] for i in range(cells // NUM_SAME_ANIMALS)]
+        selected = sets * NUM_SAME_ANIMALS + ids[:cells % NUM_SAME_ANIMALS // 2] * 2
+        selected += [0] * (cells - len(selected))
+        self.rng.shuffle(selected)
+        self.grid = [[0]*self.width for _ in range(self.height)]
+        k = 0
+        for y in range(1, self.height-1):
+            for x in range(1, self.width-1):
+                self.grid[y][x] = selected[k]
+                k += 1
+
+    def is_complete(self):
+        return all(cell == 0 for row in self.grid for cell in row)
+
+    def tiles(self):
+        """((y, x), animal) for every occupied cell"""
+        return [((y, x), v) for y, row in enumerate(self.grid) for x, v in enumerate(row) if v != 0]
+
+    def snapshot(self):
+        """Immutable copy of the grid, safe to hand to another thread"""
+        return tuple(map(tuple, self.grid))
+
+    def get_hint(self):
+        return self.moves.hint()
+
+    def moves_remaining(self):
+        return len(self.moves)
+
+    def has_moves(self):
+        return bool(self.moves.pairs)
+
+    def find_move(self):
+        """Some connectable pair, or [] if the board is dead. Unlike get_hint this doesn't build
+        the move index, whose every-pair rebuild grows quadratically with the board, but walks
+        outwards from one tile at a time and stops at the first match."""
+        for (y, x), val in self.tiles():
+            hits = [cell for cell in self.reachable(y, x) if self.grid[cell[0]][cell[1]] == val]
+            if hits:
+                return [(y, x), min(hits)]
+        return []
+
+    def remove(self, y1, x1, y2, x2):
+        self.version += 1
+        changes = {(y, x): (self.grid[y][x], 0) for y, x in ((y1, x1), (y2, x2))}
+        self.grid[y1][x1] = 0
+        self.grid[y2][x2] = 0
+        self.moves.update(changes)
+
+    def reset(self):
+        self.version += 1
+        self._reset_tiles()
+        self.moves.invalidate()
+
+    def _reset_tiles(self):
+        nonzero = [self.grid[y][x] for y in range(self.height) for x in range(self.width) if self.grid[y][x] != 0]
+        while True:
+            self.rng.shuffle(nonzero)
+            if any(self.grid[y][x] != nonzero[i] for i,(y,x) in enumerate(( (yy,xx) for yy in range(self.height) for xx in range(self.width) if self.grid[yy][xx]!=0 ))):
+                break
+        it = iter(nonzero)
+        for y in range(self.height):
+            for x in range(self.width):
+                if self.grid[y][x] != 0:
+                    self.grid[y][x] = next(it)
+
+    def touched(self, y1, x1, y2, x2, level):
+        """Cells a match of (y1, x1) and (y2, x2) can change: the two tiles and, on levels with
+        gravity, the columns (2, 3) or rows (4, 5) alter() compresses"""
+        if level in (2, 3):
+            return [(y, x) for x in {x1, x2} for y in range(self.height)]
+        if level in (4, 5):
+            return [(y, x) for y in {y1, y2} for x in range(self.width)]
+        return [(y1, x1), (y2, x2)]
+
+    def alter(self, y1, x1, y2, x2, level):
+        def compress_line(line, forward=True):
+            vals = [v for v in line if v!=0]
+            if not forward:
+                vals = [0]*(len(line)-len(vals)) + vals
+            else:
+                vals = vals + [0]*(len(line)-len(vals))
+            return vals
+
+        if level not in (2, 3, 4, 5):
+            return
+        self.version += 1
+        cells = self.touched(y1, x1, y2, x2, level) if self.moves.active else ()
+        before = {(y, x): self.grid[y][x] for y, x in cells}
+
+        if level == 2:
+            for x in (x1, x2):
+                col = [self.grid[y][x] for y in range(self.height)]
+                new = compress_line(col, forward=True)
+                for y in range(self.height): self.grid[y][x] = new[y]
+        if level == 3:
+            for x in (x1, x2):
+                col = [self.grid[y][x] for y in range(self.height)]
+                new = compress_line(col, forward=False)
+                for y in range(self.height): self.grid[y][x] = new[y]
+        if level == 4:
+            for y in (y1, y2):
+                row = self.grid[y]
+                new = compress_line(row, forward=True)
+                self.grid[y] = new
+        if level == 5:
+            for y in (y1, y2):
+                row = self.grid[y]
+                new = compress_line(row, forward=False)
+                self.grid[y] = new
+
+        changes = {(y, x): (old, self.grid[y][x]) for (y, x), old in before.items() if old != self.grid[y][x]}
+        if changes:
+            self.moves.update(changes)
+
+    def connect(self, y1, x1, y2, x2):
+        """Path of at most two turns between two matching tiles, or [] if there is none"""
+        if self.grid[y1][x1] != self.grid[y2][x2]: return []
+        PROFILER.count('connect')
+        if LEGACY_BFS: return self._bfs(y1, x1, y2, x2)
+        return self._route(y1, x1, y2, x2)
+
+    def _route(self, y1, x1, y2, x2):
+        # Every Onet path is a -> p -> q -> b where a-p and q-b run along the endpoints' own
+        # rows (or columns) and p-q is a single straight segment. So intersect the empty runs
+        # out of both endpoints and only test the connecting segment for each candidate.
+        if (y1, x1) == (y2, x2): return [(y1, x1)]
+        shortest = abs(y1-y2) + abs(x1-x2)
+        best, best_len = None, None
+
+        lo1, hi1 = self._span(y1, x1, vertical=False)
+        lo2, hi2 = self._span(y2, x2, vertical=False)
+        for x in range(max(lo1, lo2), min(hi1, hi2)+1):
+            length = abs(x1-x) + abs(y1-y2) + abs(x-x2)
+            if (best is None or length < best_len) and self._clear(y1, x, y2, x):
+                best, best_len = [(y1, x1), (y1, x), (y2, x), (y2, x2)], length
+                if length == shortest: break
+
+        if best_len != shortest:
+            lo1, hi1 = self._span(y1, x1, vertical=True)
+            lo2, hi2 = self._span(y2, x2, vertical=True)
+            for y in range(max(lo1, lo2), min(hi1, hi2)+1):
+                length = abs(y1-y) + abs(x1-x2) + abs(y-y2)
+                if (best is None or length < best_len) and self._clear(y, x1, y, x2):
+                    best, best_len = [(y1, x1), (y, x1), (y, x2), (y2, x2)], length
+                    if length == shortest: break
+
+        return self._trace(best) if best else []
+
+    def reachable(self, y, x, limit=None):
+        """Occupied cells that a path of at most two turns from (y, x) can end on, whatever
+        their animal. Each round sweeps the empty runs through the cells reached so far; a
+        run ends at tiles, which are hits. Every empty cell of a run shares its hits, so each
+        run is swept once per axis. With `limit`, stops once that many hits are found,
+        nearest turns first."""
+        grid, height, width = self.grid, self.height, self.width
+        hits, seen, swept = set(), {(y, x)}, set()
+        frontier = [(y, x)]
+        for segment in range(3):
+            reached = []
+            for cy, cx in frontier:
+                for vertical in (True, False):
+                    if (cy, cx, vertical) in swept:
+                        continue
+                    for step in (-1, 1):
+                        dy, dx = (step, 0) if vertical else (0, step)
+                        ny, nx = cy+dy, cx+dx
+                        while 0 <= ny < height and 0 <= nx < width:
+                            if grid[ny][nx]:
+                                if (ny, nx) != (y, x):
+                                    hits.add((ny, nx))
+                                    if limit and len(hits) >= limit:
+                                        return hits
+                                break
+                            swept.add((ny, nx, vertical))
+                            if segment < 2 and (ny, nx) not in seen:
+                                seen.add((ny, nx))
+                                reached.append((ny, nx))
+                            ny += dy; nx += dx
+            frontier = reached
+        return hits
+
+    def _span(self, y, x, vertical):
+        # Extent of the empty run through (y, x) along its column or row, (y, x) itself included
+        grid = self.grid
+        if vertical:
+            lo = hi = y
+            while lo > 0 and grid[lo-1][x] == 0: lo -= 1
+            while hi < self.height-1 and grid[hi+1][x] == 0: hi += 1
+        else:
+            row = grid[y]
+            lo = hi = x
+            while lo > 0 and row[lo-1] == 0: lo -= 1
+            while hi < self.width-1 and row[hi+1] == 0: hi += 1
+        return lo, hi
+
+    def _clear(self, y1, x1, y2, x2):
+        # True when every cell strictly between two cells of one row or column is empty
+        if y1 == y2:
+            row = self.grid[y1]
+            return all(row[x] == 0 for x in range(min(x1, x2)+1, max(x1, x2)))
+        return all(self.grid[y][x1] == 0 for y in range(min(y1, y2)+1, max(y1, y2)))
+
+    @staticmethod
+    def _trace(corners):
+        # Expand corner points into the cell-by-cell path format draw_path expects
+        path = [corners[0]]
+        for (ya, xa), (yb, xb) in zip(corners, corners[1:]):
+            dy, dx = (yb > ya) - (yb < ya), (xb > xa) - (xb < xa)
+            y, x = ya, xa
+            while (y, x) != (yb, xb):
+                y += dy; x += dx
+                path.append((y, x))
+        return path
+
+    def _bfs(self, y1, x1, y2, x2):
+        if self.grid[y1][x1] != self.grid[y2][x2]: return []
+        n, m = self.height, self.width
+        q = collections.deque([(y1,x1,0,None)])
+        visited = set([(y1,x1,0,None)])
+        parent = {}
+        dirs = [(-1,0,'up'),(1,0,'down'),(0,-1,'left'),(0,1,'right')]
+        while q:
+            y,x,turns,dir0 = q.popleft()
+            if PROFILER.enabled:
+                PROFILER.count('bfs states')
+            if (y,x)==(y2,x2):
+                path=[]
+                cur=(y,x,turns,dir0)
+                while cur!=(y1,x1,0,None):
+                    path.append((cur[0],cur[1]))
+                    cur=parent[cur]
+                path.append((y1,x1))
+                return list(reversed(path))
+            for dy,dx,nd in dirs:
+                ny, nx = y+dy, x+dx
+                if 0<=ny<n and 0<=nx<m and (self.grid[ny][nx]==0 or (ny,nx)==(y2,x2)):
+                    nturns = turns + (0 if dir0==nd or dir0 is None else 1)
+                    state=(ny,nx,nturns,nd)
+                    if nturns<=2 and state not in visited:
+                        visited.add(state)
+                        parent[state]=(y,x,turns,dir0)
+                        q.append(state)
+        return []
+
+    """
+    When there is no valid matches left (by using if board.get_hint() returns empty list), shuffle the board
+    """
+
+    def shuffle_board(self, ensure_move=False):
+        self.version += 1
+        self._shuffle_tiles()
+        self.moves.invalidate()
+        if ensure_move and not self.has_moves():
+            self.plant_move()
+
+    def place(self, values):
+        """Rewrite the animals on occupied cells from {(y, x): animal}, keeping the layout"""
+        self.version += 1
+        for (y, x), val in values.items():
+            self.grid[y][x] = val
+        self.moves.invalidate()
+
+    def plant_move(self):
+        """Swap one tile so that some pair is connectable; False if the layout allows no path at all.
+        Paths only depend on which cells are empty, so any connectable pair of occupied cells
+        becomes a move once both hold the same animal."""
+        tiles = self.tiles()
+        self.rng.shuffle(tiles)
+        for (a, val), (b, _) in itertools.combinations(tiles, 2):
+            if not self._route(*a, *b):
+                continue
+            if self.grid[b[0]][b[1]] != val:
+                c = next((cell for cell, v in tiles if v == val and cell != a), None)
+                if c is None: continue
+                self.place({b: val, c: self.grid[b[0]][b[1]]})
+            return True
+        return False
+
+    def _shuffle_tiles(self):
+        nonzero = [self.grid[y][x] for y in range(self.height) for x in range(self.width) if self.grid[y][x] != 0]
+        self.rng.shuffle(nonzero)
+        it = iter(nonzero)
+        for y in range(self.height):
+            for x in range(self.width):
+                if self.grid[y][x] != 0:
+                    self.grid[y][x] = next(it)
+
+class ArrayBoard(Board):
+    """Board kept in a contiguous uint8 ndarray: gravity, shuffles and the completion
+    check are vectorized and a live tile count makes is_complete O(1)."""
+    def _populate(self, animal_ids):
+        super()._populate(animal_ids)
+        self._set_grid(self.grid)
+
+    def _set_grid(self, grid):
+        if np is None:
+            raise ImportError('ArrayBoard requires numpy')
+        self.grid = np.array(grid, dtype=np.uint8)
+        self._count = int(np.count_nonzero(self.grid))
+        self._generator = None
+
+    def is_complete(self):
+        return self._count == 0
+
+    def tiles(self):
+        ys, xs = np.nonzero(self.grid)
+        return list(zip(zip(ys.tolist(), xs.tolist()), self.grid[ys, xs].tolist()))
+
+    def snapshot(self):
+        return tuple(map(tuple, self.grid.tolist()))
+
+    def remove(self, y1, x1, y2, x2):
+        self._count -= int(self.grid[y1, x1] != 0) + int(self.grid[y2, x2] != 0)
+        super().remove(y1, x1, y2, x2)
+
+    def alter(self, y1, x1, y2, x2, level):
+        if level not in (2, 3, 4, 5): return
+        self.version += 1
+        vertical, track = level in (2, 3), self.moves.active
+        changes = {}
+        for i in sorted({x1, x2} if vertical else {y1, y2}):
+            line = self.grid[:, i] if vertical else self.grid[i]
+            old = line.copy()
+            vals = old[old != 0]
+            line[:] = 0
+            if level in (2, 4):
+                line[:len(vals)] = vals
+            else:
+                line[len(line)-len(vals):] = vals
+            for j in (np.flatnonzero(old != line).tolist() if track else ()):
+                changes[(j, i) if vertical else (i, j)] = (int(old[j]), int(line[j]))
+        if changes:
+            self.moves.update(changes)
+
+    def _np_rng(self):
+        # Made on the first shuffle, seeded from the board's rng so a seeded game stays
+        # reproducible; building a Generator costs far more than the permutation itself
+        if self._generator is None:
+            self._generator = np.random.default_rng(self.rng.getrandbits(64))
+        return self._generator
+
+    def _reset_tiles(self):
+        mask = self.grid != 0
+        vals = self.grid[mask]
+        new = self._np_rng().permutation(vals)
+        while np.array_equal(new, vals) and len(np.unique(vals)) > 1:
+            new = self._np_rng().permutation(vals)
+        self.grid[mask] = new
+
+    def _shuffle_tiles(self):
+        mask = self.grid != 0
+        self.grid[mask] = self._np_rng().permutation(self.grid[mask])
+
+    def _span(self, y, x, vertical):
+        line, i = (self.grid[:, x], y) if vertical else (self.grid[y], x)
+        before, after = np.flatnonzero(line[:i]), np.flatnonzero(line[i+1:])
+        lo = int(before[-1]) + 1 if len(before) else 0
+        hi = i + int(after[0]) if len(after) else len(line) - 1
+        return lo, hi
+
+    def _clear(self, y1, x1, y2, x2):
+        if y1 == y2:
+            return not self.grid[y1, min(x1, x2)+1:max(x1, x2)].any()
+        return not self.grid[min(y1, y2)+1:max(y1, y2), x1].any()
+
+
+BOARDS = {'list': Board, 'array': ArrayBoard}  # by the names simulate.py and recorded sessions use
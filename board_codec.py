@@ -0,0 +1,231 @@
+"""Compact binary boards: a small header and one byte per cell.
+
+    encode(board, level)     HEADER (width, height, level), then the cells row by row
+    decode(data)             (grid, level)
+    to_board(data)           (Board, level)
+    digest(data)             64-bit BLAKE2b of an encoding, the same in every run and process
+
+Animal ids fit in a byte (there are 47 of them). A saved game is an encoded board behind a
+header holding the rest of the level's state. A corpus is a header naming the board size
+followed by encoded boards, which all have the same length, so CorpusReader can mmap the file
+and hand out any board by index without parsing anything before it; CorpusWriter appends.
+
+    python board_codec.py write corpus.bin [--boards N] [--level L] [--deal random|solvable]
+                          [--size W H] [--seed S]
+    python board_codec.py read corpus.bin
+"""
+import argparse
+import collections
+import hashlib
+import mmap
+import os
+import random
+import struct
+import time
+
+from atomic_write import atomic_write
+import generator
+from board import ANIMAL_IDS, Board, BOARD_HEIGHT, BOARD_WIDTH, LEVEL_MAX
+
+HEADER = struct.Struct('<HHB')  # width, height, level
+SAVE_HEADER = struct.Struct('<4sBdQ')  # magic, lives, seconds left, the level's seed
+SAVE_MAGIC = b'MAS1'
+CORPUS_HEADER = struct.Struct('<4sHH')  # magic, width, height
+CORPUS_MAGIC = b'MAC1'
+
+# board is dealt a fresh rng seeded with `seed`
+SavedGame = collections.namedtuple('SavedGame', 'board level lives time_left seed')
+
+
+def cells(board):
+    """The grid as bytes, row by row"""
+    if hasattr(board.grid, 'tobytes'):  # ArrayBoard's uint8 array already is
+        return board.grid.tobytes()
+    return b''.join(map(bytes, board.grid))
+
+
+def encode(board, level):
+    return HEADER.pack(board.width, board.height, level) + cells(board)
+
+
+def encoded_size(width, height):
+    return HEADER.size + width * height
+
+
+def decode(data):
+    """(grid, level) from encode()'s bytes or a view of them; ValueError if the cells don't
+    fill the board the header describes"""
+    if len(data) < HEADER.size:
+        raise ValueError(f'{len(data)} bytes is shorter than a board header')
+    width, height, level = HEADER.unpack_from(data)
+    if len(data) != encoded_size(width, height):
+        raise ValueError(f'{len(data)} bytes for a {width}x{height} board')
+    start = HEADER.size
+    return [list(data[start + y*width:start + (y+1)*width]) for y in range(height)], level
+
+
+def to_board(data, board_cls=Board, rng=None):
+    grid, level = decode(data)
+    return board_cls.from_grid(grid, rng), level
+
+
+def digest(data):
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+def save_game(path, board, level, lives, time_left, seed):
+    with atomic_write(path, 'wb') as f:
+        f.write(SAVE_HEADER.pack(SAVE_MAGIC, lives, time_left, seed))
+        f.write(encode(board, level))
+
+
+def load_game(path, board_cls=Board):
+    """The SavedGame in `path`; ValueError if it isn't one"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < SAVE_HEADER.size + HEADER.size:
+        raise ValueError(f'{path}: truncated save')
+    magic, lives, time_left, seed = SAVE_HEADER.unpack_from(data)
+    if magic != SAVE_MAGIC:
+        raise ValueError(f'{path}: not a saved game')
+    board, level = to_board(memoryview(data)[SAVE_HEADER.size:], board_cls, random.Random(seed))
+    return SavedGame(board, level, lives, time_left, seed)
+
+
+class CorpusWriter:
+    """Appends encoded boards of one size to a corpus file, creating it if needed"""
+    def __init__(self, path, width=BOARD_WIDTH, height=BOARD_HEIGHT):
+        self.width, self.height = width, height
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, 'rb') as f:
+                header = f.read(CORPUS_HEADER.size)
+            if len(header) < CORPUS_HEADER.size:
+                raise ValueError(f'{path}: truncated corpus header')
+            magic, w, h = CORPUS_HEADER.unpack(header)
+            if magic != CORPUS_MAGIC or (w, h) != (width, height):
+                raise ValueError(f'{path}: not a corpus of {width}x{height} boards')
+            self._file = open(path, 'ab')
+        else:
+            self._file = open(path, 'wb')
+            self._file.write(CORPUS_HEADER.pack(CORPUS_MAGIC, width, height))
+
+    def write(self, board, level):
+        if (board.width, board.height) != (self.width, self.height):
+            raise ValueError(f'{board.width}x{board.height} board in a corpus of {self.width}x{self.height}')
+        self._file.write(encode(board, level))
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CorpusReader:
+    """Memory-mapped corpus: len(), indexing and iteration give each board's encoding as a
+    zero-copy memoryview. Views still held at close() keep the mapping alive until they go."""
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        if os.fstat(self._file.fileno()).st_size < CORPUS_HEADER.size:  # mmap can't map an empty file
+            self._file.close()
+            raise ValueError(f'{path}: truncated corpus header')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.width, self.height = CORPUS_HEADER.unpack_from(self._map)
+        if magic != CORPUS_MAGIC:
+            self.close()
+            raise ValueError(f'{path}: not a board corpus')
+        self.record = encoded_size(self.width, self.height)
+        self._count = (len(self._map) - CORPUS_HEADER.size) // self.record
+        self._view = memoryview(self._map)
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        start = CORPUS_HEADER.size + i * self.record
+        return self._view[start:start + self.record]
+
+    def __iter__(self):
+        return (self[i] for i in range(self._count))
+
+    def level(self, i):
+        return self[i][HEADER.size - 1]
+
+    def board(self, i, board_cls=Board, rng=None):
+        """(board, level) for the i-th encoding"""
+        return to_board(self[i], board_cls, rng)
+
+    def close(self):
+        if getattr(self, '_view', None) is not None:
+            self._view.release()
+            self._view = None
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # unmapped once the last view is dropped
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_corpus(path, boards, levels, deal='random', size=(BOARD_WIDTH, BOARD_HEIGHT), seed=0):
+    """Append `boards` seeded boards for each level; returns seconds taken"""
+    begin = time.perf_counter()
+    with CorpusWriter(path, *size) as out:
+        for level in levels:
+            for s in range(seed, seed + boards):
+                rng = random.Random(s)
+                board = Board(ANIMAL_IDS, *size, rng)
+                if deal == 'solvable':
+                    generator.make_solvable(board, level)
+                out.write(board, level)
+    return time.perf_counter() - begin
+
+
+def read_corpus(path):
+    """Decode every board into a Board; returns (boards, distinct boards, seconds)"""
+    begin = time.perf_counter()
+    with CorpusReader(path) as corpus:
+        seen = set()
+        for i, data in enumerate(corpus):
+            seen.add(digest(data))
+            corpus.board(i)
+        n = len(corpus)
+    return n, len(seen), time.perf_counter() - begin
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    write = sub.add_parser('write', help='append seeded boards to a corpus')
+    write.add_argument('path')
+    write.add_argument('--boards', type=int, default=10000, help='boards per level')
+    write.add_argument('--level', type=int, choices=range(1, LEVEL_MAX + 1), help='only this level')
+    write.add_argument('--deal', choices=('random', 'solvable'), default='random')
+    write.add_argument('--size', type=int, nargs=2, default=(BOARD_WIDTH, BOARD_HEIGHT), metavar=('W', 'H'))
+    write.add_argument('--seed', type=int, default=0)
+    read = sub.add_parser('read', help='decode every board of a corpus')
+    read.add_argument('path')
+    args = parser.parse_args()
+    if args.command == 'write':
+        levels = [args.level] if args.level else range(1, LEVEL_MAX + 1)
+        seconds = write_corpus(args.path, args.boards, levels, args.deal, tuple(args.size), args.seed)
+        print(f'{args.boards * len(levels)} boards written in {seconds:.2f}s')
+    else:
+        n, distinct, seconds = read_corpus(args.path)
+        print(f'{n} boards ({distinct} distinct) decoded in {seconds:.2f}s, {n / seconds:.0f} boards/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,9 @@
+"""Shared fixtures: `board_cls` runs a test on every board class this install can build."""
+import pytest
+
+from board import BOARDS, np
+
+
+@pytest.fixture(params=[name for name in BOARDS if name == 'list' or np is not None])
+def board_cls(request):
+    return BOARDS[request.param]
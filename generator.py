@@ -0,0 +1,91 @@
+"""Boards that are solvable by construction.
+
+A layout is played backwards with its tiles treated as anonymous placeholders: connectable
+pairs are removed under the level's gravity rule (Board.alter) until the board is empty.
+Paths only depend on which cells are empty, so giving both tiles of every removed pair the
+same animal produces a board that this exact removal order clears.
+"""
+import collections
+
+from board import Board, BOARD_HEIGHT, BOARD_WIDTH
+
+MAX_ATTEMPTS = 20  # random removal walks to try before giving up on a layout
+CELL_SAMPLES = 32  # random cells pick_pair tries before going through every tile
+REACH_SAMPLE = 8  # reachable tiles pick_pair chooses a partner from
+
+
+def removal_order(board, level, rng):
+    """(cells, order) where `order` is a list of index pairs into `cells`, the occupied cells
+    of the board, that empties the layout under `level`. None if the walk got stuck."""
+    cells = [cell for cell, _ in board.tiles()]
+    scratch = Board.from_grid([[0]*board.width for _ in range(board.height)], rng)
+    for i, (y, x) in enumerate(cells, start=1):
+        scratch.grid[y][x] = i
+    order = []
+    for _ in range(len(cells) // 2):
+        pair = pick_pair(scratch, rng)
+        if pair is None:
+            return None
+        a, b = pair
+        order.append((scratch.grid[a[0]][a[1]]-1, scratch.grid[b[0]][b[1]]-1))
+        scratch.remove(*a, *b)
+        scratch.alter(*a, *b, level)
+    return cells, order
+
+
+def pick_pair(board, rng):
+    """A random connectable pair of tiles, whatever their animals, or None if there is none.
+    Random cells are tried first, which is cheap while the board is not nearly empty, and
+    every tile only if those all miss; each tile's partner comes from at most REACH_SAMPLE
+    of the cells it reaches, so large sparse boards don't cast rays from every empty cell."""
+    for _ in range(CELL_SAMPLES):
+        y, x = rng.randrange(board.height), rng.randrange(board.width)
+        if board.grid[y][x]:
+            hits = board.reachable(y, x, REACH_SAMPLE)
+            if hits:
+                return (y, x), rng.choice(sorted(hits))
+    tiles = board.tiles()
+    rng.shuffle(tiles)
+    for a, _ in tiles:
+        hits = board.reachable(*a, REACH_SAMPLE)
+        if hits:
+            return a, rng.choice(sorted(hits))
+    return None
+
+
+def make_solvable(board, level, rng=None, attempts=MAX_ATTEMPTS):
+    """Redeal the animals already on the board over its current layout so that the board can
+    be cleared under `level`. Returns False, leaving the board untouched, if no removal
+    order was found within `attempts` walks."""
+    rng = rng or board.rng
+    counts = collections.Counter(val for _, val in board.tiles())
+    pairs = [val for val, n in counts.items() for _ in range(n // 2)]
+    for _ in range(attempts):
+        found = removal_order(board, level, rng)
+        if found:
+            break
+    else:
+        return False
+    cells, order = found
+    rng.shuffle(pairs)
+    values = {}
+    for (i, j), val in zip(order, pairs):
+        values[cells[i]] = values[cells[j]] = val
+    board.place(values)
+    return True
+
+
+def generate(animal_ids, level, width=BOARD_WIDTH, height=BOARD_HEIGHT, rng=None, board_cls=Board):
+    """Fresh board of `board_cls` dealt so that it can be cleared under `level`"""
+    board = board_cls(animal_ids, width, height, rng)
+    make_solvable(board, level)
+    return board
+
+
+def reshuffle(board, level, attempts=3):
+    """Shuffle a dead board into a solvable deal, or failing that one with at least one move.
+    Returns False only when the layout admits no path at all."""
+    if make_solvable(board, level, attempts=attempts):
+        return True
+    board.shuffle_board(ensure_move=True)
+    return board.has_moves()
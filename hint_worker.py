@@ -0,0 +1,66 @@
+"""Hint and dead-board analysis off the frame loop.
+
+The level screen hands the worker an immutable snapshot of the board after every change
+and whenever a hint is due. A background thread looks for one move on a private copy
+(find_move, which stops at the first match) and, if there is none, deals a solvable
+reshuffle for it. The result is delivered through a callback (the game posts it as a
+pygame event) tagged with the board and its version, so the main loop can drop results for
+a board that changed in the meantime.
+"""
+import collections
+import random
+import threading
+import traceback
+
+import generator
+from board import Board
+
+# hint: a connectable pair or []; layout: {(y, x): animal} to place if the board was dead,
+# as analyse(grid, level, seed) deals it
+Analysis = collections.namedtuple('Analysis', 'board version show hint layout seed')
+
+
+def analyse(grid, level, seed):
+    """(hint, layout) for a grid; layout is None unless the grid has no moves left"""
+    board = Board.from_grid(grid, random.Random(seed))
+    hint = board.find_move()
+    if hint:
+        return hint, None
+    generator.reshuffle(board, level)
+    return [], dict(board.tiles())
+
+
+class HintWorker:
+    """One daemon thread answering the most recent request; a newer request replaces one
+    that has not started yet, since its answer would be stale anyway"""
+    def __init__(self, deliver):
+        self.deliver = deliver
+        self._job = None
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='hint-worker', daemon=True)
+        self._thread.start()
+
+    def submit(self, board, level, show=False):
+        """Analyse `board` as it is now; `show` marks a request whose hint should be displayed"""
+        # The seed comes from the board's rng so a seeded game reshuffles reproducibly
+        job = (board, board.version, show, board.snapshot(), level, board.rng.getrandbits(64))
+        with self._cond:
+            if self._job and self._job[0] is board and self._job[1] == board.version:
+                show = show or self._job[2]
+                job = job[:2] + (show,) + job[3:]
+            self._job = job
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._job is None:
+                    self._cond.wait()
+                (board, version, show, grid, level, seed), self._job = self._job, None
+            try:
+                hint, layout = analyse(grid, level, seed)
+            except Exception:
+                # Reported, not fatal: the worker stays up and the next request is analysed
+                traceback.print_exc()
+                continue
+            self.deliver(Analysis(board, version, show, hint, layout, seed))
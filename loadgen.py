@@ -0,0 +1,144 @@
+"""Load generator for server.py: many clients playing many boards at once over localhost.
+
+Each client opens one connection and starts `--sessions` boards, then plays them in turn like
+a player following the hints: HINT, then MOVE the hinted pair (SHUFFLE when there is none),
+starting a fresh board whenever one is won or expires. Every request waits for its answer
+before the next is sent, and its round trip is timed.
+
+    python loadgen.py [--clients C] [--sessions S] [--duration SECONDS] [--level L]
+                      [--host H] [--port P | --unix PATH] [--spawn]
+
+--spawn starts a server.py subprocess on the given address for the run.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from board import LEVEL_MAX
+from profiler import percentile
+import server
+
+PERCENTILES = (50, 95, 99)
+
+
+class Client:
+    def __init__(self, reader, writer, level):
+        self.reader = reader
+        self.writer = writer
+        self.level = level
+        self.latency = {}  # command -> [seconds]
+        self.moves = self.won = 0
+
+    async def ask(self, line):
+        begin = time.perf_counter()
+        self.writer.write(line.encode('ascii') + b'\n')
+        reply = (await self.reader.readline()).decode('ascii').split()
+        self.latency.setdefault(line.split(None, 1)[0], []).append(time.perf_counter() - begin)
+        if not reply:
+            raise ConnectionError('server closed the connection')
+        return reply
+
+    async def new(self):
+        reply = await self.ask(f'NEW {self.level}')
+        if reply[0] != 'OK':
+            raise RuntimeError(' '.join(reply))
+        return reply[1]
+
+    async def play(self, sessions, until):
+        sids = [await self.new() for _ in range(sessions)]
+        while time.perf_counter() < until:
+            for i, sid in enumerate(sids):
+                hint = await self.ask(f'HINT {sid}')
+                if hint[0] == 'ERR':  # expired
+                    sids[i] = await self.new()
+                    continue
+                if hint[1] == 'NONE':
+                    await self.ask(f'SHUFFLE {sid}')
+                    continue
+                reply = await self.ask(f'MOVE {sid} {" ".join(hint[1:])}')
+                self.moves += reply[0] in ('OK', 'WON')
+                if reply[0] in ('WON', 'ERR'):
+                    self.won += reply[0] == 'WON'
+                    sids[i] = await self.new()
+        for sid in sids:
+            await self.ask(f'END {sid}')
+
+
+async def connect(host, port, unix):
+    if unix:
+        return await asyncio.open_unix_connection(unix)
+    return await asyncio.open_connection(host, port)
+
+
+async def wait_for_server(host, port, unix, timeout=10.0):
+    give_up = time.perf_counter() + timeout
+    while True:
+        try:
+            _, writer = await connect(host, port, unix)
+        except OSError:
+            if time.perf_counter() > give_up:
+                raise
+            await asyncio.sleep(0.1)
+            continue
+        writer.close()
+        return
+
+
+async def run(clients, sessions, duration, level, host, port, unix, spawn):
+    """Returns (clients, seconds) once every client has played for `duration` seconds"""
+    proc = None
+    if spawn:
+        where = ['--unix', unix] if unix else ['--host', host, '--port', str(port)]
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server.py'), *where,
+            stdout=asyncio.subprocess.DEVNULL)
+    try:
+        await wait_for_server(host, port, unix)
+        players = [Client(*await connect(host, port, unix), level) for _ in range(clients)]
+        begin = time.perf_counter()
+        await asyncio.gather(*(p.play(sessions, begin + duration) for p in players))
+        seconds = time.perf_counter() - begin
+        for p in players:
+            p.writer.close()
+        return players, seconds
+    finally:
+        if proc:
+            proc.terminate()
+            await proc.wait()
+
+
+def report(players, seconds):
+    moves = sum(p.moves for p in players)
+    won = sum(p.won for p in players)
+    latency = {}
+    for p in players:
+        for command, values in p.latency.items():
+            latency.setdefault(command, []).extend(values)
+    everything = [v for values in latency.values() for v in values]
+    print(f"{'request':<9}{'count':>9}" + ''.join(f"{f'p{p} ms':>10}" for p in PERCENTILES))
+    for command, values in sorted(latency.items()) + [('all', everything)]:
+        values.sort()
+        print(f'{command:<9}{len(values):>9}' + ''.join(f'{percentile(values, p) * 1000:>10.2f}' for p in PERCENTILES))
+    print(f'{moves} moves ({won} boards won) in {seconds:.1f}s: {moves / seconds:.0f} moves/s, '
+          f'{len(everything) / seconds:.0f} requests/s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=50, help='connections')
+    parser.add_argument('--sessions', type=int, default=20, help='boards per connection')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds to play for')
+    parser.add_argument('--level', type=int, choices=range(1, LEVEL_MAX + 1), default=1)
+    parser.add_argument('--host', default=server.HOST)
+    parser.add_argument('--port', type=int, default=server.PORT)
+    parser.add_argument('--unix', help='connect to this unix socket instead')
+    parser.add_argument('--spawn', action='store_true', help='run a server for the duration')
+    args = parser.parse_args()
+    report(*asyncio.run(run(args.clients, args.sessions, args.duration, args.level,
+                            args.host, args.port, args.unix, args.spawn)))
+
+
+if __name__ == '__main__':
+    main()
@@ -3,24 +3,60 @@ import sys
 import random
 import time
 import os
+import threading
 import collections
+import atexit
+import io
 from pygame.locals import *
+from board import Board, ArrayBoard, BOARD_WIDTH, BOARD_HEIGHT, LEVEL_MAX
+from renderer import BoardRenderer, RenderCache
+from mixer import MixerManager
+from profiler import PROFILER
+from timeline import Timeline, ease_out
+from pacing import FramePacer, report as cpu_report
+from hint_worker import HintWorker
+from replay import Recorder
+from prefetch import LevelPlan, Prefetcher, prepare
+import board_codec
+from surface_cache import load_scaled
 
 # Constants
 FPS = 60
 WINDOW_WIDTH = 1200
 WINDOW_HEIGHT = 800
 BOX_SIZE = 70
-BOARD_WIDTH = 14
-BOARD_HEIGHT = 9
-NUM_ANIMALS_ON_BOARD = 26
-NUM_SAME_ANIMALS = 4
 TIME_BAR_LENGTH = 350
 TIME_BAR_WIDTH = 30
-LEVEL_MAX = 5
 INITIAL_LIVES = 3
 GAME_TIME = 180
 HINT_INTERVAL = 30
+HINT_TIME = 2.0  # seconds a hint stays highlighted
+MATCH_TIME = 0.3  # seconds the path and the matched tiles take to fade out
+LEVEL_PAUSE = 1.0  # seconds the next level is announced for
+EFFECT_CACHE_BYTES = 4 * 1024 * 1024  # decoded effect sounds kept in memory at once
+MIXER_CHANNELS = 8  # channels sound effects share; beyond that the least important voice is cut
+SOUND_PRIORITY = {'correct_sound': 3, 'wrong_sound': 3, 'shuffle': 3, 'click': 2, 'effect': 1}
+STARTUP_REPORT = False  # print time to first frame, load time and peak memory at startup
+CPU_REPORT = False  # print the CPU used on each screen when the game exits
+IDLE_REDRAW = 0.25  # seconds between level screen redraws while nothing animates
+FONT_FILE = 'animal_fonts/DungeonFont.ttf'
+LOGO_SIZE = (WINDOW_WIDTH // 3, WINDOW_HEIGHT // 2 - 50)
+GAME_OVER_SIZE = (int(WINDOW_WIDTH // 1.5), WINDOW_HEIGHT // 3)
+MENU_LABELS = ("NEW GAME", "OPTIONS", "EXIT")
+CONTINUE_LABEL = "CONTINUE"  # shown above the others while there is a saved game
+SAVE_FILE = 'savegame.bin'  # in the game folder; closing the window during a level saves it here
+MENU_PADDING = (10, 5)
+ARRAY_BOARD = False  # play on the NumPy-backed ArrayBoard instead of nested lists
+BOARD_SIZE = (BOARD_WIDTH, BOARD_HEIGHT)  # cells across and down; e.g. (100, 60) for a marathon board
+BOARD_VIEW = (0, 90, WINDOW_WIDTH, WINDOW_HEIGHT - 90)  # screen area of a board too big for the window
+ZOOM_LEVELS = (70, 50, 35, 24, 16)  # tile sizes the mouse wheel steps through on a big board
+SCROLL_STEP = 4  # cells an arrow key scrolls a big board by
+PROFILE = False  # time frame phases from the start; F4 toggles profiling and its overlay in a level
+PROFILE_EXPORT = None  # e.g. 'profile.csv' (every frame) or 'profile.json' (rolling summary)
+PROFILE_REFRESH = 30  # frames between profiler overlay updates
+SEED = None  # e.g. 1234 deals the same boards, backgrounds, music and sound effects every session
+RECORD_SESSION = None  # e.g. 'session.json' records every level played, for replay.py
+PREFETCH_VALIDATE = False  # have solver.py check each prefetched board can be cleared
 
 # Colors
 GRAY = (100, 100, 100)
@@ -32,262 +68,308 @@ BOLD_GREEN = (0, 175, 0)
 BLUE = (0, 0, 255)
 PURPLE = (255, 0, 255)
 
+STARTED = time.perf_counter()
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB, or None where it can't be read"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def menu_button_size(font):
+    """Size of the start screen buttons: the widest/tallest label plus padding"""
+    text_sizes = [font.size(txt) for txt in MENU_LABELS + (CONTINUE_LABEL,)]
+    return (max(w for w, h in text_sizes) + 2 * MENU_PADDING[0],
+            max(h for w, h in text_sizes) + 2 * MENU_PADDING[1])
+
+def image_specs(path):
+    """(image file, size) for every image the game loads pre-scaled, for warming the surface cache"""
+    pygame.font.init()
+    font_path = os.path.join(path, FONT_FILE)
+    font_big, font_small = pygame.font.Font(font_path, 60), pygame.font.Font(font_path, 45)
+    specs = []
+    for folder, size in (('animal_icon', (BOX_SIZE, BOX_SIZE)), ('animal_background', (WINDOW_WIDTH, WINDOW_HEIGHT))):
+        specs += [(os.path.join(path, folder, fname), size) for fname in sorted(os.listdir(os.path.join(path, folder)))]
+    comp = os.path.join(path, 'animal_components')
+    specs += [(os.path.join(path, 'heart.png'), (BOX_SIZE, BOX_SIZE)),
+              (os.path.join(comp, 'logo_match.png'), LOGO_SIZE),
+              (os.path.join(comp, 'button.png'), menu_button_size(font_big)),
+              (os.path.join(comp, 'button.png'), font_small.size('Return')),
+              (os.path.join(comp, 'game_over.png'), GAME_OVER_SIZE)]
+    return specs
+
+# Tile states in the atlas
+TILE_NORMAL, TILE_SELECTED, TILE_HINTED = range(3)
+SCROLL_KEYS = {K_LEFT: (-1, 0), K_RIGHT: (1, 0), K_UP: (0, -1), K_DOWN: (0, 1)}
+HINT_READY = pygame.event.custom_type()  # a hint_worker.Analysis, in the event's `result`
+
+class SoundCache:
+    """Decodes sounds on first use and keeps the most recently played ones within a byte budget"""
+    def __init__(self, paths, max_bytes):
+        self.paths = list(paths)
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._sounds = collections.OrderedDict()  # path -> (Sound, decoded size)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def get(self, path):
+        if path in self._sounds:
+            self._sounds.move_to_end(path)
+            return self._sounds[path][0]
+        snd = pygame.mixer.Sound(path)
+        freq, fmt, channels = pygame.mixer.get_init()
+        size = int(snd.get_length() * freq * channels * (abs(fmt) // 8))
+        self._sounds[path] = (snd, size)
+        self.bytes += size
+        # Always keep the sound just decoded, even if it alone is over budget
+        while self.bytes > self.max_bytes and len(self._sounds) > 1:
+            _, (_, evicted) = self._sounds.popitem(last=False)
+            self.bytes -= evicted
+        return snd
+
 class AssetManager:
+    """Loads images and UI sounds on a worker thread; poll `progress`/`ready` and call
+    finish() on the main thread, which converts the surfaces for the display."""
     def __init__(self, base_path):
         self.base_path = base_path
         self.animals = {}
         self.backgrounds = []
         self.music = []
         self.sounds = {}
-        self.effect_sounds = []
-        self._load_assets()
+        eff_dir = os.path.join(base_path, 'sound_effect')
+        self.effect_sounds = SoundCache((os.path.join(eff_dir, f) for f in sorted(os.listdir(eff_dir))),
+                                        EFFECT_CACHE_BYTES)
+        self.icon = pygame.image.load(os.path.join(self.base_path, 'animal_components/logo_match.png'))
+        self._loaded = 0
+        self._total = (len(os.listdir(os.path.join(base_path, 'animal_icon')))
+                       + len(os.listdir(os.path.join(base_path, 'animal_background'))) + 5)
+        self._error = None
+        self._thread = threading.Thread(target=self._load_assets, daemon=True)
+        self._thread.start()
+
+    @property
+    def progress(self):
+        return self._loaded / self._total
+
+    @property
+    def ready(self):
+        return not self._thread.is_alive()
+
+    def _step(self):
+        self._loaded += 1
+
+    def finish(self):
+        self._thread.join()
+        if self._error:
+            raise self._error
+        for idx, img in self.animals.items():
+            self.animals[idx] = img.convert_alpha()
+        self.backgrounds = [bg.convert() for bg in self.backgrounds]
+        self.heart = self.heart.convert_alpha()
+        self._build_atlas()
 
     def _load_assets(self):
+        try:
+            self._load()
+        except Exception as e:  # surfaced on the main thread by finish()
+            self._error = e
+
+    def _load(self):
         # Animal icons
         icons_dir = os.path.join(self.base_path, 'animal_icon')
         for idx, fname in enumerate(os.listdir(icons_dir), start=1):
-            img = pygame.image.load(os.path.join(icons_dir, fname))
-            self.animals[idx] = pygame.transform.scale(img, (BOX_SIZE, BOX_SIZE))
+            self.animals[idx] = load_scaled(self.base_path, os.path.join(icons_dir, fname), (BOX_SIZE, BOX_SIZE))
+            self._step()
 
         # Background images
         bg_dir = os.path.join(self.base_path, 'animal_background')
         for fname in sorted(os.listdir(bg_dir)):
-            img = pygame.image.load(os.path.join(bg_dir, fname))
-            self.backgrounds.append(pygame.transform.scale(img, (WINDOW_WIDTH, WINDOW_HEIGHT)))
+            self.backgrounds.append(load_scaled(self.base_path, os.path.join(bg_dir, fname), (WINDOW_WIDTH, WINDOW_HEIGHT)))
+            self._step()
 
         # Music tracks
         for i in range(1, 6):
             path = os.path.join(self.base_path, f'animal_music/bg_music_{i}.mp3')
             self.music.append(path)
 
-        # Sounds
-        self.sounds['click'] = pygame.mixer.Sound(os.path.join(self.base_path, 'gui_button_click.mp3'))
-        self.sounds['correct_sound'] = pygame.mixer.Sound(os.path.join(self.base_path, 'correct_sound.mp3'))
-        self.sounds['wrong_sound'] = pygame.mixer.Sound(os.path.join(self.base_path, 'wrong_sound.mp3'))
-        self.sounds['shuffle'] = pygame.mixer.Sound(os.path.join(self.base_path, 'shuffling_board.mp3'))
-
-        # Effect sounds
-        eff_dir = os.path.join(self.base_path, 'sound_effect')
-        for fname in os.listdir(eff_dir):
-            snd = pygame.mixer.Sound(os.path.join(eff_dir, fname))
-            self.effect_sounds.append(snd)
+        # Sounds; effect sounds are decoded on first use by self.effect_sounds
+        for key, fname in (('click', 'gui_button_click.mp3'), ('correct_sound', 'correct_sound.mp3'),
+                           ('wrong_sound', 'wrong_sound.mp3'), ('shuffle', 'shuffling_board.mp3')):
+            self.sounds[key] = pygame.mixer.Sound(os.path.join(self.base_path, fname))
+            self._step()
 
         # Heart icon
         heart_path = os.path.join(self.base_path, 'heart.png')
-        img = pygame.image.load(heart_path)
-        self.heart = pygame.transform.scale(img, (BOX_SIZE, BOX_SIZE))
-
-        #Game icon
-        self.icon = pygame.image.load(os.path.join(self.base_path, 'animal_components/logo_match.png'))
-
-class Board:
-    def __init__(self):
-        self.width = BOARD_WIDTH
-        self.height = BOARD_HEIGHT
-        self.grid = []
-        self._populate()
-
-    def _populate(self):
-        ids = list(asset_manager.animals.keys())
-        random.shuffle(ids)
-        selected = ids[:NUM_ANIMALS_ON_BOARD] * NUM_SAME_ANIMALS
-        random.shuffle(selected)
-        self.grid = [[0]*self.width for _ in range(self.height)]
-        k = 0
-        for y in range(1, self.height-1):
-            for x in range(1, self.width-1):
-                self.grid[y][x] = selected[k]
-                k += 1
-
-    def is_complete(self):
-        return all(cell == 0 for row in self.grid for cell in row)
-
-    def get_hint(self):
-        pos = collections.defaultdict(list)
-        for y in range(self.height):
-            for x in range(self.width):
-                if self.grid[y][x] != 0:
-                    pos[self.grid[y][x]].append((y, x))
-        for val, cells in pos.items():
-            for (y1, x1), (y2, x2) in zip(cells, cells[1:]):
-                if self._bfs(y1, x1, y2, x2):
-                    return [(y1, x1), (y2, x2)]
-        return []
-
-    def reset(self):
-        nonzero = [self.grid[y][x] for y in range(self.height) for x in range(self.width) if self.grid[y][x] != 0]
-        while True:
-            random.shuffle(nonzero)
-            if any(self.grid[y][x] != nonzero[i] for i,(y,x) in enumerate(( (yy,xx) for yy in range(self.height) for xx in range(self.width) if self.grid[yy][xx]!=0 ))):
-                break
-        it = iter(nonzero)
-        for y in range(self.height):
-            for x in range(self.width):
-                if self.grid[y][x] != 0:
-                    self.grid[y][x] = next(it)
-
-    def alter(self, y1, x1, y2, x2, level):
-        def compress_line(line, forward=True):
-            vals = [v for v in line if v!=0]
-            if not forward:
-                vals = [0]*(len(line)-len(vals)) + vals
-            else:
-                vals = vals + [0]*(len(line)-len(vals))
-            return vals
-
-        if level == 2:
-            for x in (x1, x2):
-                col = [self.grid[y][x] for y in range(self.height)]
-                new = compress_line(col, forward=True)
-                for y in range(self.height): self.grid[y][x] = new[y]
-        if level == 3:
-            for x in (x1, x2):
-                col = [self.grid[y][x] for y in range(self.height)]
-                new = compress_line(col, forward=False)
-                for y in range(self.height): self.grid[y][x] = new[y]
-        if level == 4:
-            for y in (y1, y2):
-                row = self.grid[y]
-                new = compress_line(row, forward=True)
-                self.grid[y] = new
-        if level == 5:
-            for y in (y1, y2):
-                row = self.grid[y]
-                new = compress_line(row, forward=False)
-                self.grid[y] = new
-
-    def _bfs(self, y1, x1, y2, x2):
-        if self.grid[y1][x1] != self.grid[y2][x2]: return []
-        n, m = self.height, self.width
-        q = collections.deque([(y1,x1,0,None)])
-        visited = set([(y1,x1,0,None)])
-        parent = {}
-        dirs = [(-1,0,'up'),(1,0,'down'),(0,-1,'left'),(0,1,'right')]
-        while q:
-            y,x,turns,dir0 = q.popleft()
-            if (y,x)==(y2,x2):
-                path=[]
-                cur=(y,x,turns,dir0)
-                while cur!=(y1,x1,0,None):
-                    path.append((cur[0],cur[1]))
-                    cur=parent[cur]
-                path.append((y1,x1))
-                return list(reversed(path))
-            for dy,dx,nd in dirs:
-                ny, nx = y+dy, x+dx
-                if 0<=ny<n and 0<=nx<m and (self.grid[ny][nx]==0 or (ny,nx)==(y2,x2)):
-                    nturns = turns + (0 if dir0==nd or dir0 is None else 1)
-                    state=(ny,nx,nturns,nd)
-                    if nturns<=2 and state not in visited:
-                        visited.add(state)
-                        parent[state]=(y,x,turns,dir0)
-                        q.append(state)
-        return []
-
-    """
-    When there is no valid matches left (by using if board.get_hint() returns empty list), shuffle the board
-    """
-
-    def shuffle_board(self):
-        asset_manager.sounds['shuffle'].play()
-        nonzero = [self.grid[y][x] for y in range(self.height) for x in range(self.width) if self.grid[y][x] != 0]
-        random.shuffle(nonzero)
-        it = iter(nonzero)
-        for y in range(self.height):
-            for x in range(self.width):
-                if self.grid[y][x] != 0:
-                    self.grid[y][x] = next(it)
+        self.heart = load_scaled(self.base_path, heart_path, (BOX_SIZE, BOX_SIZE))
+        self._step()
+
+    def _build_atlas(self):
+        # Every animal in every tile state on one converted surface: a column per animal, a row
+        # per state, so selection dimming is baked in once instead of per frame. Overlay states
+        # are drawn over the plain tile already on the board, so the hint state is just the
+        # outline, stored once in an extra column and shared by all animals.
+        self.atlas = pygame.Surface(((len(self.animals)+1)*BOX_SIZE, 2*BOX_SIZE), pygame.SRCALPHA).convert_alpha()
+        outline = pygame.Rect(len(self.animals)*BOX_SIZE, 0, BOX_SIZE, BOX_SIZE)
+        pygame.draw.rect(self.atlas, GREEN, outline, 2)
+        self.atlas_areas = {}
+        self.scaled_atlases = {}
+        for col, val in enumerate(sorted(self.animals)):
+            for state in (TILE_NORMAL, TILE_SELECTED):
+                area = pygame.Rect(col*BOX_SIZE, state*BOX_SIZE, BOX_SIZE, BOX_SIZE)
+                # RGBA_MAX onto the blank atlas copies the pixels, alpha included, without blending
+                self.atlas.blit(self.animals[val], area, special_flags=pygame.BLEND_RGBA_MAX)
+                if state == TILE_SELECTED:
+                    self.atlas.fill((60,60,60), area, special_flags=pygame.BLEND_RGB_SUB)
+                self.atlas_areas[val, state] = area
+            self.atlas_areas[val, TILE_HINTED] = outline
+
+    def tiles_at(self, box_size):
+        """(atlas, areas) for tiles `box_size` pixels wide; zoomed copies are scaled on first use"""
+        if box_size == BOX_SIZE:
+            return self.atlas, self.atlas_areas
+        if box_size not in self.scaled_atlases:
+            w, h = self.atlas.get_size()
+            atlas = pygame.transform.smoothscale(self.atlas, (w*box_size//BOX_SIZE, h*box_size//BOX_SIZE))
+            areas = {key: pygame.Rect(r.x*box_size//BOX_SIZE, r.y*box_size//BOX_SIZE, box_size, box_size)
+                     for key, r in self.atlas_areas.items()}
+            self.scaled_atlases[box_size] = atlas, areas
+        return self.scaled_atlases[box_size]
 
 class Game:
-    def __init__(self, path):
+    def __init__(self, path, board_size=BOARD_SIZE, seed=SEED, clock=time.time, record=RECORD_SESSION):
         pygame.init()
         pygame.mixer.pre_init()
         pygame.mixer.init()
+        self.mixer = MixerManager(MIXER_CHANNELS)
         self.clock = pygame.time.Clock()
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
 
         pygame.display.set_caption('Matching Animals')
         self.path = path
-        global asset_manager
-        asset_manager = AssetManager(path)
-        pygame.display.set_icon(asset_manager.icon)
+        self.board_size = board_size
         self.level = 1
         self.lives = INITIAL_LIVES
-
-        font_path = os.path.join(self.path, "animal_fonts/DungeonFont.ttf")
+        # Everything random in a session comes from this rng and every level gets its own seed,
+        # so a session or a recorded level can be dealt again; `clock` is what levels time with
+        self.seed = random.getrandbits(64) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.sfx_rng = random.Random(self.seed + 1)  # its own stream: rolled once per match
+        self.now = clock
+        self.recorder = Recorder(record, self.seed) if record else None
+        self.prefetcher = Prefetcher()
+        self.save_path = os.path.join(path, SAVE_FILE)
+
+        font_path = os.path.join(self.path, FONT_FILE)
         self.font_big = pygame.font.Font(font_path, 60)
         self.font_small = pygame.font.Font(font_path, 45)
+        self.font_tiny = pygame.font.Font(font_path, 24)
+
+        self.cache = RenderCache(path)
+        if CPU_REPORT:
+            atexit.register(lambda: print('\n'.join(cpu_report())))
+        self.hints = HintWorker(lambda result: pygame.event.post(pygame.event.Event(HINT_READY, result=result)))
+        PROFILER.enabled = PROFILE
+        PROFILER.export_path = PROFILE_EXPORT
+        self.current_music = None
+
+        global asset_manager
+        asset_manager = AssetManager(path)
+        pygame.display.set_icon(asset_manager.icon)
+        self.show_loading()
 
         # default volumes
         self.music_volume = 0.5
         self.sfx_volume   = 0.5
-        pygame.mixer.music.set_volume(self.music_volume)
-        for snd in asset_manager.sounds.values():
-            snd.set_volume(self.sfx_volume)
+        self._applied_volumes = (None, None)
+        self.apply_volumes()
+
+    def show_loading(self):
+        """Progress screen shown while AssetManager loads in the background"""
+        bar = pygame.Rect(0, 0, WINDOW_WIDTH // 2, TIME_BAR_WIDTH)
+        bar.center = (WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2)
+        first_frame = None
+        while not asset_manager.ready:
+            for e in pygame.event.get():
+                if e.type == QUIT:
+                    pygame.quit(); sys.exit()
+            self.screen.fill(NAVY_BLUE)
+            txt = self.font_small.render(f'Loading... {asset_manager.progress:.0%}', True, WHITE)
+            self.screen.blit(txt, txt.get_rect(midbottom=(bar.centerx, bar.top - 20)))
+            pygame.draw.rect(self.screen, WHITE, bar, 1)
+            pygame.draw.rect(self.screen, BOLD_GREEN, (bar.x+2, bar.y+2, (bar.w-4)*asset_manager.progress, bar.h-4))
+            pygame.display.update()
+            if first_frame is None:
+                first_frame = time.perf_counter() - STARTED
+            self.clock.tick(FPS)
+        asset_manager.finish()
+        if STARTUP_REPORT:
+            loaded = time.perf_counter() - STARTED
+            first = f'{first_frame:.2f}s' if first_frame is not None else 'n/a (already loaded)'
+            rss = peak_rss_mb()
+            print(f'startup: first frame {first}, assets ready {loaded:.2f}s, '
+                  f'peak RSS {f"{rss:.0f} MB" if rss is not None else "n/a"}')
 
     def run(self):
         while True:
-            self.show_start_screen()
-            self.level = 1
-            self.lives = INITIAL_LIVES
+            self.prefetcher.start(*self.level_args(1))  # dealt while the menu is up
+            saved = self.load_game() if self.show_start_screen() else None
+            self.level = saved.level if saved else 1
+            self.lives = saved.lives if saved else INITIAL_LIVES
             while self.level <= LEVEL_MAX:
-                level_complete = self.run_level()
+                level_complete = self.run_level(saved)
+                saved = None
+                if self.recorder:
+                    self.recorder.end_level(self.now(), level_complete)
                 if not level_complete:
                     self.show_game_over()
                     break  # return to main menu
                 self.level += 1
-                pygame.time.wait(1000)
+                if self.level <= LEVEL_MAX:
+                    self.show_level_transition()
 
     def show_start_screen(self):
 
-        logo_surf = pygame.image.load(os.path.join(self.path, "animal_components/logo_match.png"))
-        logo_surf = pygame.transform.scale(logo_surf, (WINDOW_WIDTH // 3, WINDOW_HEIGHT // 2 - 50))
+        logo_surf = self.cache.image("animal_components/logo_match.png", LOGO_SIZE)
         logo_rect = logo_surf.get_rect(centerx=WINDOW_WIDTH // 2)
 
-        bg = pygame.image.load(os.path.join(self.path, "animal_background/main_bg.jpg"))
-        bg = pygame.transform.scale(bg, (WINDOW_WIDTH, WINDOW_HEIGHT))
+        bg = self.cache.image("animal_background/main_bg.jpg", (WINDOW_WIDTH, WINDOW_HEIGHT), alpha=False)
 
-        pygame.mixer.music.load(os.path.join(self.path, "animal_music/bg_music_main.mp3"))
-        pygame.mixer.music.set_volume(self.music_volume)  # use your existing volume setting
-        pygame.mixer.music.play(-1, 0.0)
+        # keeps playing, rather than restarting, when coming back from the options menu
+        self.play_music(os.path.join(self.path, "animal_music/bg_music_main.mp3"))
 
         # 1) define your labels and fonts
-        labels = [
-            ("NEW GAME", self.font_big),
-            ("OPTIONS",  self.font_big),
-            ("EXIT",     self.font_big)
-        ]
+        names = ((CONTINUE_LABEL,) if os.path.exists(self.save_path) else ()) + MENU_LABELS
+        labels = [(txt, self.font_big) for txt in names]
 
         # 2) compute max text width + padding
-        PADDING_X = 10
-        PADDING_Y = 5
-
-        text_sizes = [font.size(txt) for txt, font in labels]
-        max_text_width = max(w for w, h in text_sizes)
-        max_text_height = max(h for w, h in text_sizes)
-
-        btn_width  = max_text_width + 2 * PADDING_X
-        btn_height = max_text_height + 2 * PADDING_Y
+        PADDING_Y = MENU_PADDING[1]
+        btn_width, btn_height = menu_button_size(self.font_big)
 
         # load & scale your button image once
-        btn_img = pygame.image.load(os.path.join(self.path, "animal_components/button.png"))
-        btn_img = pygame.transform.scale(btn_img, (btn_width, btn_height))
+        btn_img = self.cache.image("animal_components/button.png", (btn_width, btn_height))
 
         # 3) build button rects centered vertically
         total_height = len(labels) * btn_height + (len(labels) - 1) * PADDING_Y
         start_y = (WINDOW_HEIGHT - total_height) // 2
         vertical_offset = 100  # ← how many pixels to move down
         start_y += vertical_offset
+        start_y = max(start_y, LOGO_SIZE[1] + 30)  # with CONTINUE too the logo still fits above
 
         buttons = []
         for i, (txt, font) in enumerate(labels):
-            surf = font.render(txt, True, WHITE)
+            surf = self.cache.text(font, txt, WHITE)
             rect = pygame.Rect(0, 0, btn_width, btn_height)
             rect.centerx = WINDOW_WIDTH // 2
             rect.top = start_y + i * (btn_height + PADDING_Y)
             buttons.append((surf, rect))
 
-        # 4) event loop
+        # 4) event loop; the menu is static, so it is only redrawn once something happened
+        pacer = FramePacer('menu', FPS)
         while True:
             self.screen.blit(bg, (0, 0))
             # draw logo above buttons
@@ -304,23 +386,27 @@ class Game:
                 self.screen.blit(surf, text_rect)
 
             pygame.display.update()
-            self.clock.tick(FPS)
 
-            for e in pygame.event.get():
+            events = pacer.wait()
+            while all(e.type == MOUSEMOTION for e in events):
+                events = pacer.wait()  # hovering changes nothing on screen
+            for e in events:
                 if e.type == QUIT:
                     pygame.quit(); sys.exit()
                 elif e.type == MOUSEBUTTONUP:
                     mx, my = e.pos
-                    asset_manager.sounds['click'].play()
+                    self.play_sound('click')
                     # check which button was clicked
-                    if   buttons[0][1].collidepoint(mx, my): return        # NEW GAME
-                    elif buttons[1][1].collidepoint(mx, my): self.show_options_menu()
-                    elif buttons[2][1].collidepoint(mx, my): pygame.quit(); sys.exit()
+                    clicked = next((txt for txt, (_, rect) in zip(names, buttons) if rect.collidepoint(mx, my)), None)
+                    if   clicked == CONTINUE_LABEL: return True
+                    elif clicked == "NEW GAME":     return False
+                    elif clicked == "OPTIONS":      self.show_options_menu()
+                    elif clicked == "EXIT":         pygame.quit(); sys.exit()
 
 
     def show_options_menu(self):
         """Simple mixer for music & SFX + a Return button"""
-        return_txt = self.font_small.render('Return', True, WHITE)
+        return_txt = self.cache.text(self.font_small, 'Return', WHITE)
         return_rect = return_txt.get_rect(center=(WINDOW_WIDTH//2, WINDOW_HEIGHT - 80))
 
         # slider lines
@@ -330,14 +416,14 @@ class Game:
         adjusting = None
 
         # re-use the same button.png as your “Return” background
-        return_img = pygame.image.load(os.path.join(self.path, "animal_components/button.png"))
-        return_img = pygame.transform.scale(return_img, (return_rect.width, return_rect.height))
+        return_img = self.cache.image("animal_components/button.png", return_rect.size)
 
+        pacer = FramePacer('options', FPS)
         while True:
             self.screen.fill(NAVY_BLUE)
             # labels
-            self.screen.blit(self.font_small.render('Music Volume', True, WHITE), (music_line.x, music_line.y - 80))
-            self.screen.blit(self.font_small.render('SFX Volume',   True, WHITE), (sfx_line.x,   sfx_line.y + 10))
+            self.screen.blit(self.cache.text(self.font_small, 'Music Volume', WHITE), (music_line.x, music_line.y - 80))
+            self.screen.blit(self.cache.text(self.font_small, 'SFX Volume',   WHITE), (sfx_line.x,   sfx_line.y + 10))
             # draw lines
             pygame.draw.rect(self.screen, WHITE, music_line)
             pygame.draw.rect(self.screen, WHITE, sfx_line)
@@ -354,13 +440,15 @@ class Game:
             self.screen.blit(return_txt, return_rect)
 
             pygame.display.update()
-            self.clock.tick(FPS)
 
-            for e in pygame.event.get():
+            events = pacer.wait()
+            while not adjusting and all(e.type == MOUSEMOTION for e in events):
+                events = pacer.wait()  # only dragging a knob changes the screen
+            for e in events:
                 if e.type == QUIT:
                     pygame.quit(); sys.exit()
                 elif e.type == MOUSEBUTTONDOWN:
-                    asset_manager.sounds['click'].play()
+                    self.play_sound('click')
                     if music_knob.collidepoint(e.pos):
                         adjusting = 'music'
                     elif sfx_knob.collidepoint(e.pos):
@@ -374,155 +462,335 @@ class Game:
                     if adjusting == 'music':
                         rel = (mx - music_line.x) / music_line.w
                         self.music_volume = max(0.0, min(1.0, rel))
-                        pygame.mixer.music.set_volume(self.music_volume)
                     else:
                         rel = (mx - sfx_line.x) / sfx_line.w
                         self.sfx_volume = max(0.0, min(1.0, rel))
-                        for snd in asset_manager.sounds.values():
-                            snd.set_volume(self.sfx_volume)
 
-    def run_level(self):
-        board = Board()
+            # apply slider moves once per frame, however many motion events came in
+            self.apply_volumes()
+
+    def apply_volumes(self):
+        """Push volume changes to the mixer, skipping anything that hasn't changed"""
+        if self.music_volume != self._applied_volumes[0]:
+            pygame.mixer.music.set_volume(self.music_volume)
+        if self.sfx_volume != self._applied_volumes[1]:
+            self.mixer.set_volume(self.sfx_volume)
+        self._applied_volumes = (self.music_volume, self.sfx_volume)
+
+    def play_sound(self, name):
+        self.mixer.play(asset_manager.sounds[name], SOUND_PRIORITY[name], name)
+
+    def play_music(self, path, loops=-1, data=None):
+        """Start a music track unless it is already the one playing; `data`, the file's bytes
+        read ahead of time, saves going to disk"""
+        if path == self.current_music and pygame.mixer.music.get_busy():
+            return
+        if data is None:
+            pygame.mixer.music.load(path)
+        else:
+            # kept referenced: the mixer streams from it for as long as the track plays
+            self.music_file = io.BytesIO(data)
+            pygame.mixer.music.load(self.music_file, os.path.splitext(path)[1][1:])
+        pygame.mixer.music.set_volume(self.music_volume)
+        pygame.mixer.music.play(loops)
+        self.current_music = path
+
+    def level_args(self, level):
+        """prepare() arguments for `level`. Its seed, background and music are drawn from the
+        session rng here, in the same order whether or not the level ends up prefetched."""
+        return (asset_manager.animals.keys(), level, self.board_size, self.rng.getrandbits(64),
+                ArrayBoard if ARRAY_BOARD else Board, self.rng.choice(asset_manager.backgrounds),
+                self.rng.choice(asset_manager.music), PREFETCH_VALIDATE)
+
+    def save_game(self, board, time_left, seed):
+        try:
+            board_codec.save_game(self.save_path, board, self.level, self.lives, time_left, seed)
+        except OSError as e:
+            print(f'could not save the game: {e}')
+
+    def load_game(self):
+        """The saved game, removed from disk so it can only be resumed once; None if it can't
+        be read"""
+        try:
+            saved = board_codec.load_game(self.save_path, ArrayBoard if ARRAY_BOARD else Board)
+        except (OSError, ValueError) as e:
+            print(f'could not load the saved game: {e}')
+            saved = None
+        try:
+            os.remove(self.save_path)
+        except OSError:
+            pass
+        return saved
+
+    def run_level(self, saved=None):
+        """Play the current level, or resume the board_codec.SavedGame `saved`"""
+        if saved:
+            plan = LevelPlan(self.level, saved.seed, saved.board, self.rng.choice(asset_manager.backgrounds),
+                             self.rng.choice(asset_manager.music), None)
+        else:
+            plan = self.prefetcher.take(self.level) or prepare(*self.level_args(self.level))
+        if self.level < LEVEL_MAX:
+            self.prefetcher.start(*self.level_args(self.level + 1))
+        board = plan.board
+        width, height = board.width, board.height
         clicked = []
         first = None
 
-        #Time estimation + bonus
-        start_time = time.time()
-        end_time = start_time + GAME_TIME
+        #Time estimation + bonus; bigger boards get proportionally more time
+        level_time = GAME_TIME * max(1, width * height / (BOARD_WIDTH * BOARD_HEIGHT))
+        start_time = self.now()
+        end_time = start_time + (saved.time_left if saved else level_time)
+        if self.recorder:
+            self.recorder.start_level(start_time, self.level, plan.seed, board, asset_manager.animals.keys(),
+                                      resumed=bool(saved))
 
         last_hint_time = start_time
         bar_pos = ((WINDOW_WIDTH - TIME_BAR_LENGTH)//2, 30)
         bar_size = (TIME_BAR_LENGTH, TIME_BAR_WIDTH)
-        bg = random.choice(asset_manager.backgrounds)
-        music = random.choice(asset_manager.music)
-
-        pygame.mixer.music.load(music)
-        pygame.mixer.music.play(-1)
+        bg = plan.background
+        self.play_music(plan.music, data=plan.music_data)
+
+        # A board that fits is centred in the window as always; a bigger one gets the area under
+        # the time bar and starts at the largest zoom that shows it whole, if there is one
+        big = width*BOX_SIZE > WINDOW_WIDTH or height*BOX_SIZE > WINDOW_HEIGHT
+        view = pygame.Rect(BOARD_VIEW) if big else self.screen.get_rect()
+        zoom = BOX_SIZE
+        if big:
+            zoom = next((z for z in ZOOM_LEVELS if width*z <= view.w and height*z <= view.h), ZOOM_LEVELS[-1])
+        renderer = BoardRenderer(self.screen, bg, asset_manager.tiles_at, view, zoom, (width, height))
+        renderer.refresh(board)
+        show_stats = False
+        show_profile = PROFILE
+        profile_lines = []
+        animations = Timeline()
+        pacer = FramePacer('level', FPS)
+        events = []
 
         while True:
-            now = time.time()
+            PROFILER.begin_frame()
+            now = self.now()
 
             if now >= end_time:
                 pygame.mixer.music.stop()
+                PROFILER.flush()
                 return False
 
-            self.screen.blit(bg, (0,0))
-            self.draw_board(board)
-            self.draw_clicked(board, clicked)
-            self.draw_time_bar(now, end_time, bar_pos, bar_size)
-            self.draw_lives()
-
             if now - last_hint_time > HINT_INTERVAL:
-                hint = board.get_hint()
+                # answered by a HINT_READY event, which also reshuffles a dead board
+                self.hints.submit(board, self.level, show=True)
                 last_hint_time = now
-                if hint:
-                    self.draw_hint(hint)
-                else:
-                    board.shuffle_board()
 
-            for e in pygame.event.get():
+            for e in events:
                 if e.type == QUIT:
+                    if self.recorder:
+                        self.recorder.end_level(now, False)  # the recording is only written per level
+                    self.save_game(board, end_time - now, plan.seed)  # offered as CONTINUE next time
                     pygame.quit(); sys.exit()
+                if e.type == HINT_READY:
+                    result = e.result
+                    if result.board is not board or result.version != board.version:
+                        continue  # the board changed since the snapshot was taken
+                    if result.layout:
+                        self.play_sound('shuffle')
+                        board.place(result.layout)
+                        if self.recorder:
+                            self.recorder.shuffled(now, result.seed, board)
+                        renderer.refresh(board)
+                    elif result.hint and result.show:
+                        if not all(renderer.visible(*cell) for cell in result.hint):
+                            renderer.center_on(*result.hint[0])
+                            renderer.refresh(board)
+                        animations.add(now, HINT_TIME, self.hint_animation(board, renderer, result.hint), key='hint')
                 if e.type == KEYUP:
                     if e.key == K_ESCAPE:
+                        PROFILER.flush()
                         return False  # triggers game over and returns to menu
-                if e.type == MOUSEBUTTONUP:
-                    x, y = e.pos
-                    bx = (x - (WINDOW_WIDTH - BOX_SIZE * BOARD_WIDTH)//2)//BOX_SIZE
-                    by = (y - (WINDOW_HEIGHT - BOX_SIZE * BOARD_HEIGHT)//2)//BOX_SIZE
-                    if 0 <= bx < BOARD_WIDTH and 0 <= by < BOARD_HEIGHT and board.grid[by][bx] != 0:
+                    if e.key == K_F3:
+                        show_stats = not show_stats
+                    if e.key == K_F4:
+                        show_profile = PROFILER.enabled = not show_profile
+                        if not show_profile:
+                            PROFILER.flush()
+                            PROFILER.reset()
+                if e.type == KEYDOWN and big and e.key in SCROLL_KEYS:
+                    dx, dy = SCROLL_KEYS[e.key]
+                    if renderer.scroll_by(dx*SCROLL_STEP, dy*SCROLL_STEP):
+                        renderer.refresh(board)
+                if e.type == MOUSEWHEEL and big:
+                    i = ZOOM_LEVELS.index(renderer.box_size) if renderer.box_size in ZOOM_LEVELS else 0
+                    i = max(0, min(len(ZOOM_LEVELS)-1, i - e.y))  # wheel up zooms in
+                    if ZOOM_LEVELS[i] != renderer.box_size:
+                        renderer.set_zoom(ZOOM_LEVELS[i])
+                        renderer.refresh(board)
+                if e.type == MOUSEBUTTONUP and e.button in (1, 2, 3):
+                    cell = renderer.cell_at(e.pos)
+                    if cell and board.grid[cell[0]][cell[1]] != 0:
+                        by, bx = cell
+                        if self.recorder:
+                            self.recorder.click(now, by, bx)
                         clicked.append((by, bx))
                         if not first:
                             first = (by, bx)
-                            asset_manager.sounds['click'].play()
+                            self.play_sound('click')
                         else:
                             # Prevent clicking the same tile twice
                             if (first[0], first[1]) == (by, bx):
-                                asset_manager.sounds['click'].play()
+                                self.play_sound('click')
                             else:
-                                path = board._bfs(first[0], first[1], by, bx)
+                                with PROFILER.phase('connect'):
+                                    path = board.connect(first[0], first[1], by, bx)
                                 if path:
-                                    if random.random() < 0.2:
-                                        random.choice(asset_manager.effect_sounds).play()
-                                    asset_manager.sounds['correct_sound'].play()
-                                    board.grid[first[0]][first[1]] = 0
-                                    board.grid[by][bx] = 0
-                                    self.draw_path(path)
+                                    if self.sfx_rng.random() < 0.2:
+                                        # picked now so the seeded stream doesn't depend on playback;
+                                        # only decoded if the mixer has a channel for it
+                                        effect = self.sfx_rng.choice(asset_manager.effect_sounds.paths)
+                                        self.mixer.play(lambda: asset_manager.effect_sounds.get(effect),
+                                                        SOUND_PRIORITY['effect'], 'effect')
+                                    self.play_sound('correct_sound')
+                                    matched = [(first, board.grid[first[0]][first[1]]), ((by, bx), board.grid[by][bx])]
+                                    board.remove(first[0], first[1], by, bx)
+                                    animations.add(now, MATCH_TIME, self.match_animation(renderer, path, matched),
+                                                   easing=ease_out)
                                     end_time += 1
-                                    board.alter(first[0], first[1], by, bx, self.level)
+                                    with PROFILER.phase('alter'):
+                                        board.alter(first[0], first[1], by, bx, self.level)
+                                    if self.recorder:
+                                        self.recorder.matched(board)
                                     if board.is_complete():
+                                        renderer.refresh(board)
+                                        renderer.present([])
+                                        PROFILER.flush()
                                         return True
+                                    # a dead board is reshuffled when the analysis comes back
+                                    self.hints.submit(board, self.level)
+                                    with PROFILER.phase('refresh'):
+                                        renderer.refresh(board)
                                 else:
-                                    asset_manager.sounds['wrong_sound'].play()
+                                    self.play_sound('wrong_sound')
                             clicked = []
                             first = None
 
-            pygame.display.update()
-            self.clock.tick(FPS)
+            fill = int((bar_size[0]-4) * max(0, end_time - now) / level_time)
+            overlays = [
+                (('time', fill), (*bar_pos, max(bar_size[0], fill+4), bar_size[1]),
+                 lambda: self.draw_time_bar(now, end_time, level_time, bar_pos, bar_size)),
+                (('lives', self.lives), self.lives_rect(), self.draw_lives),
+            ]
+            overlays.extend(animations.update(now))
+            for by, bx in clicked:
+                if renderer.visible(by, bx):
+                    val = board.grid[by][bx]
+                    overlays.append(((TILE_SELECTED, by, bx, val), renderer.cell_rect(by, bx),
+                                     renderer.sprite(val, TILE_SELECTED)))
+            if show_stats:
+                text = f'{renderer.stats.text()}  {pacer.text()}  {self.mixer.text()}'
+                overlays.append((('stats', text), pygame.Rect((10, WINDOW_HEIGHT-34), self.font_tiny.size(text)),
+                                 lambda: self.screen.blit(self.cache.text(self.font_tiny, text, WHITE), (10, WINDOW_HEIGHT-34))))
+            if show_profile:
+                if not profile_lines or PROFILER.frame % PROFILE_REFRESH == 0:
+                    profile_lines = PROFILER.lines()
+                overlays.append(self.profile_overlay(profile_lines))
+            with PROFILER.phase('present'):
+                renderer.present(overlays)
+            PROFILER.end_frame()
+            # Full frame rate only while something moves (the profiler wants every frame);
+            # otherwise sleep until input, the next time bar step, the hint or the time-out
+            events = pacer.wait(busy=bool(animations) or show_profile,
+                                timeout=min(IDLE_REDRAW, last_hint_time + HINT_INTERVAL - now, end_time - now))
         pygame.mixer.music.stop()
 
-    def draw_board(self, board):
-        xm = (WINDOW_WIDTH-BOX_SIZE*BOARD_WIDTH)//2
-        ym = (WINDOW_HEIGHT-BOX_SIZE*BOARD_HEIGHT)//2
-        for y in range(BOARD_HEIGHT):
-            for x in range(BOARD_WIDTH):
-                val = board.grid[y][x]
-                if val:
-                    rect = pygame.Rect(x*BOX_SIZE+xm, y*BOX_SIZE+ym, BOX_SIZE, BOX_SIZE)
-                    self.screen.blit(asset_manager.animals[val], rect)
-
-    def draw_clicked(self, board, clicked):
-        xm = (WINDOW_WIDTH-BOX_SIZE*BOARD_WIDTH)//2
-        ym = (WINDOW_HEIGHT-BOX_SIZE*BOARD_HEIGHT)//2
-        for by,bx in clicked:
-            rect = pygame.Rect(bx*BOX_SIZE+xm, by*BOX_SIZE+ym, BOX_SIZE, BOX_SIZE)
-            img = asset_manager.animals[board.grid[by][bx]].copy()
-            img.fill((60,60,60), special_flags=pygame.BLEND_RGB_SUB)
-            self.screen.blit(img, rect)
-
-    def draw_time_bar(self, now, end_time, pos, size):
+    def profile_overlay(self, lines):
+        """Overlay listing the profiler summary in the top right corner"""
+        line_height = self.font_tiny.get_linesize()
+        width = max(self.font_tiny.size(line)[0] for line in lines)
+        rect = pygame.Rect(WINDOW_WIDTH - width - 10, 70, width, line_height * len(lines))
+        def draw():
+            # rendered directly: these change too often to be worth a slot in the text cache
+            for i, line in enumerate(lines):
+                self.screen.blit(self.font_tiny.render(line, True, WHITE), (rect.x, rect.y + i*line_height))
+        return ('profile', tuple(lines)), rect, draw
+
+    def draw_time_bar(self, now, end_time, total, pos, size):
         remaining = max(0, end_time - now)
-        pct = remaining / GAME_TIME
+        pct = remaining / total
         pygame.draw.rect(self.screen, WHITE, (*pos, *size), 1)
         inner = (pos[0]+2, pos[1]+2, (size[0]-4)*pct, size[1]-4)
         pygame.draw.rect(self.screen, BOLD_GREEN, inner)
 
     def draw_lives(self):
         self.screen.blit(asset_manager.heart, (10,10))
-        txt = self.font_small.render(str(self.lives), True, WHITE)
-        self.screen.blit(txt, (80,20))
-
-    def draw_path(self, path):
-        xm = (WINDOW_WIDTH-BOX_SIZE*BOARD_WIDTH)//2
-        ym = (WINDOW_HEIGHT-BOX_SIZE*BOARD_HEIGHT)//2
-        for i in range(len(path)-1):
-            y1,x1 = path[i]; y2,x2 = path[i+1]
-            p1 = (x1*BOX_SIZE+xm+BOX_SIZE//2, y1*BOX_SIZE+ym+BOX_SIZE//2)
-            p2 = (x2*BOX_SIZE+xm+BOX_SIZE//2, y2*BOX_SIZE+ym+BOX_SIZE//2)
-            pygame.draw.line(self.screen, RED, p1, p2, 4)
-        pygame.display.update(); pygame.time.wait(300)
-
-    def draw_hint(self, hint):
-        xm = (WINDOW_WIDTH-BOX_SIZE*BOARD_WIDTH)//2
-        ym = (WINDOW_HEIGHT-BOX_SIZE*BOARD_HEIGHT)//2
-        for y,x in hint:
-            rect = pygame.Rect(x*BOX_SIZE+xm, y*BOX_SIZE+ym, BOX_SIZE, BOX_SIZE)
-            pygame.draw.rect(self.screen, GREEN, rect, 2)
+        self.screen.blit(self.cache.text(self.font_small, str(self.lives), WHITE), (80,20))
+
+    def lives_rect(self):
+        return pygame.Rect(10, 10, BOX_SIZE, BOX_SIZE).union(pygame.Rect((80, 20), self.font_small.size(str(self.lives))))
+
+    def match_animation(self, renderer, path, matched):
+        """Timeline callback fading out a match: its path line over the two removed tiles.
+        Both are painted once into a translucent sprite whose alpha drops as the tween runs."""
+        cells = [renderer.cell_rect(*cell) for cell, _ in matched]
+        centers = [renderer.cell_rect(*cell).center for cell in path]
+        area = cells[0].unionall(cells[1:] + [pygame.Rect(c, (1, 1)) for c in centers]).inflate(4, 4)
+        sprite = pygame.Surface(area.size, SRCALPHA)
+        for (cell, val), rect in zip(matched, cells):
+            sprite.blit(*renderer.sprite(val), rect.move(-area.x, -area.y))
+        if len(centers) > 1:
+            pygame.draw.lines(sprite, RED, False, [(x - area.x, y - area.y) for x, y in centers], 4)
+        # on a scrolling board the path may leave the visible cells
+        shown = area.clip(renderer.view)
+        def frame(t):
+            alpha = int(255 * (1 - t))
+            if not alpha or not shown:
+                return []
+            def draw():
+                sprite.set_alpha(alpha)
+                self.screen.blit(sprite, shown, shown.move(-area.x, -area.y))
+            return [(('match', id(sprite), alpha), shown, draw)]
+        return frame
+
+    def hint_animation(self, board, renderer, hint):
+        """Timeline callback highlighting a hinted pair for as long as both tiles are still there"""
+        cells = [(by, bx, board.grid[by][bx]) for by, bx in hint]
+        def frame(t):
+            if any(board.grid[by][bx] != val for by, bx, val in cells):
+                return []
+            return [((TILE_HINTED, by, bx, val), renderer.cell_rect(by, bx), renderer.sprite(val, TILE_HINTED))
+                    for by, bx, val in cells if renderer.visible(by, bx)]
+        return frame
+
+    def show_level_transition(self, duration=LEVEL_PAUSE):
+        """Fade the next level's number in over the last frame. Input keeps being handled and a
+        click or key press skips the rest of the pause."""
+        banner = self.cache.text(self.font_big, f'LEVEL {self.level}', WHITE).copy()
+        rect = banner.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
+        backdrop = self.screen.subsurface(rect).copy()
+        timeline = Timeline()
+        timeline.add(self.now(), duration, lambda t: banner.set_alpha(int(255 * min(1.0, 3 * t))), easing=ease_out)
+        while timeline:
+            for e in pygame.event.get():
+                if e.type == QUIT:
+                    pygame.quit(); sys.exit()
+                if e.type in (KEYUP, MOUSEBUTTONUP):
+                    return
+            timeline.update(self.now())
+            self.screen.blit(backdrop, rect)
+            self.screen.blit(banner, rect)
+            pygame.display.update(rect)
+            self.clock.tick(FPS)
 
     def show_game_over(self):
 
         # Create "Return" text and rect
-        playAgainSurf = self.font_big.render('Return', True, PURPLE)
+        playAgainSurf = self.cache.text(self.font_big, 'Return', PURPLE)
         playAgainRect = playAgainSurf.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
 
         # Load and scale logo
-        logo_surf = pygame.image.load(os.path.join(self.path, "animal_components/game_over.png"))
-        logo_surf = pygame.transform.scale(logo_surf, (WINDOW_WIDTH // 1.5, WINDOW_HEIGHT // 3))
+        logo_surf = self.cache.image("animal_components/game_over.png", GAME_OVER_SIZE)
         logo_rect = logo_surf.get_rect(centerx=WINDOW_WIDTH // 2)
 
         # Position the logo above the Return button
         logo_rect.bottom = playAgainRect.top - 40  # 40 px above
 
+        pacer = FramePacer('game over', FPS)
         while True:
             self.screen.fill(NAVY_BLUE)
             self.screen.blit(playAgainSurf, playAgainRect)
@@ -530,7 +798,10 @@ class Game:
             pygame.draw.rect(self.screen, PURPLE, playAgainRect, 4)
             pygame.display.update()
 
-            for event in pygame.event.get():
+            events = pacer.wait()
+            while all(event.type == MOUSEMOTION for event in events):
+                events = pacer.wait()
+            for event in events:
                 if event.type == QUIT:
                     pygame.quit()
                     sys.exit()
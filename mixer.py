@@ -0,0 +1,85 @@
+"""Sound effects on a fixed pool of mixer channels.
+
+Sound.play() leaves it to SDL_mixer to find a channel, so in a burst of matches the chimes,
+clicks and random effect sounds steal channels from each other in no particular order.
+MixerManager owns every channel instead and decides itself:
+
+- a sound goes to a free channel if there is one, else it takes over the channel of the
+  least important voice playing, the oldest one among equals, provided that voice is no more
+  important than the new sound; otherwise the new sound is dropped;
+- the same sound can't restart within `retrigger` seconds, so a burst plays one copy instead
+  of a pile of them;
+- volume is set on the channels, in one place, so it reaches every sound, including effect
+  sounds that are only decoded later.
+
+play() also takes a function returning the sound, called only once a channel is granted, so a
+sound that won't be heard is never decoded.
+"""
+import time
+
+import pygame
+
+CHANNELS = 8
+RETRIGGER = 0.05  # seconds before the same sound may start again
+
+
+class MixerManager:
+    def __init__(self, channels=CHANNELS, retrigger=RETRIGGER, clock=time.perf_counter):
+        pygame.mixer.set_num_channels(channels)
+        pygame.mixer.set_reserved(channels)  # a stray Sound.play() can't take one of ours
+        self.channels = [pygame.mixer.Channel(i) for i in range(channels)]
+        self.voices = [(float('-inf'), 0.0)] * channels  # (priority, started) of each channel's last sound
+        self.retrigger = retrigger
+        self.clock = clock
+        self.volume = 1.0
+        self.last = {}  # key -> time it last started
+        self.played = self.stolen = self.dropped = self.throttled = 0
+
+    def play(self, sound, priority=0, key=None):
+        """Play `sound` (or the sound a function returns) at `priority`, higher being more
+        important. `key` names it for the retrigger limit and defaults to the sound itself.
+        Returns the channel, or None if the sound was throttled or dropped."""
+        now = self.clock()
+        key = sound if key is None else key
+        if now - self.last.get(key, float('-inf')) < self.retrigger:
+            self.throttled += 1
+            return None
+        i = self._channel(priority)
+        if i is None:
+            self.dropped += 1
+            return None
+        if callable(sound):
+            sound = sound()
+        channel = self.channels[i]
+        channel.play(sound)
+        channel.set_volume(self.volume)
+        self.voices[i] = (priority, now)
+        self.last[key] = now
+        self.played += 1
+        return channel
+
+    def _channel(self, priority):
+        busy = []
+        for i, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return i
+            busy.append((self.voices[i], i))
+        (victim, _), i = min(busy)
+        if victim > priority:
+            return None
+        self.stolen += 1
+        return i
+
+    def set_volume(self, volume):
+        """Volume of every effect, playing or to come"""
+        self.volume = volume
+        for channel in self.channels:
+            channel.set_volume(volume)
+
+    def active(self):
+        """Voices playing right now"""
+        return sum(1 for channel in self.channels if channel.get_busy())
+
+    def text(self):
+        return (f'voices {self.active()}/{len(self.channels)}  stolen {self.stolen}  '
+                f'dropped {self.dropped}  throttled {self.throttled}')
@@ -0,0 +1,60 @@
+"""Frame pacing that only wakes the game up when there is something to draw.
+
+A screen asks its FramePacer for the next batch of events. While something animates the
+pacer runs at the full frame rate like clock.tick(FPS); otherwise it blocks in
+pygame.event.wait until input arrives or the screen's next timer (time bar step, hint,
+time-out) is due, so an idle window costs next to no CPU.
+
+Every pacer adds its CPU and wall-clock time to USAGE under the screen's name, for
+report().
+"""
+import time
+
+import pygame
+
+USAGE = {}  # screen name -> [cpu seconds, wall seconds, frames]
+
+
+class FramePacer:
+    def __init__(self, name, fps):
+        self.name = name
+        self.fps = fps
+        self.clock = pygame.time.Clock()
+        self.usage = USAGE.setdefault(name, [0.0, 0.0, 0])
+        self.cpu = self.wall = 0.0
+        self._cpu, self._wall = time.process_time(), time.perf_counter()
+
+    def wait(self, busy=False, timeout=None):
+        """Events for the next frame. While `busy` frames come at the full frame rate;
+        otherwise block until an event arrives or `timeout` seconds pass (None waits for
+        input alone). Bursts of input still get no more than `fps` frames a second."""
+        self._account()
+        if busy:
+            self.clock.tick(self.fps)
+            return pygame.event.get()
+        if timeout is None:
+            first = pygame.event.wait()
+        else:
+            first = pygame.event.wait(max(1, int(timeout * 1000)))
+        self.clock.tick(self.fps)
+        events = pygame.event.get()
+        return events if first.type == pygame.NOEVENT else [first] + events
+
+    def _account(self):
+        cpu, wall = time.process_time(), time.perf_counter()
+        self.cpu += cpu - self._cpu
+        self.wall += wall - self._wall
+        self.usage[0] += cpu - self._cpu
+        self.usage[1] += wall - self._wall
+        self.usage[2] += 1
+        self._cpu, self._wall = cpu, wall
+
+    def text(self):
+        """CPU use of this screen visit so far"""
+        return f'{self.name} CPU {self.cpu / self.wall if self.wall else 0.0:.0%}'
+
+
+def report():
+    """One line per screen: share of a core used, time spent there and frames drawn"""
+    return [f'{name:<10} {cpu / wall if wall else 0.0:>5.1%} CPU over {wall:7.1f}s, {frames} frames'
+            for name, (cpu, wall, frames) in USAGE.items()]
@@ -0,0 +1,93 @@
+"""The next level, prepared while the current one is played.
+
+Starting a level used to deal its board, pick its background and load its music in the first
+frame. The game now draws the next level's seed, background and music as soon as a level
+starts and hands them to a Prefetcher, whose worker thread deals the board (optionally having
+solver.py check that it can be cleared) and reads the music file into memory. By the time the
+level transition is over everything is ready, so the next level starts without a hitch.
+"""
+import collections
+import random
+import threading
+from concurrent.futures import Future
+
+import generator
+import solver
+from board import BOARD_HEIGHT, BOARD_WIDTH
+
+VALIDATE_NODES = 20000  # solver budget for checking a board; an undecided board is kept
+# every solver node tries all same-animal pairs, so beyond the default size the budget would
+# take minutes; larger boards are used as dealt
+VALIDATE_MAX_CELLS = BOARD_WIDTH * BOARD_HEIGHT
+REDEALS = 3  # fresh deals to try when a board is proven unsolvable
+
+# seed is the one the board was finally dealt from; music_data is the music file's bytes
+LevelPlan = collections.namedtuple('LevelPlan', 'level seed board background music music_data')
+
+
+def prepare(animal_ids, level, size, seed, board_cls, background, music, validate=False):
+    """Deal a level's board from `seed` and read its music; runs on the worker thread, or on
+    the caller's when nothing was prefetched"""
+    width, height = size
+    validate = validate and width * height <= VALIDATE_MAX_CELLS
+    for _ in range(REDEALS + 1):
+        board = generator.generate(animal_ids, level, width, height, random.Random(seed), board_cls)
+        if not validate or clearable(board, level):
+            break
+        seed = random.Random(seed).getrandbits(64)
+    with open(music, 'rb') as f:
+        music_data = f.read()
+    return LevelPlan(level, seed, board, background, music, music_data)
+
+
+def clearable(board, level):
+    """False only for a board the solver proved can't be cleared. generator.generate falls
+    back to a random deal when it finds no removal order, which is what this catches."""
+    search = solver.Solver(board, level, VALIDATE_NODES)
+    return search.solve() is not None or search.exhausted
+
+
+class Prefetcher:
+    """Prepares one level at a time on a daemon thread, so quitting never waits for a deal
+    still running; starting another drops the one pending"""
+    def __init__(self):
+        self._pending = None  # (level, Future)
+        self._job = None  # (prepare()'s arguments, Future) not picked up yet
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='prefetch', daemon=True)
+        self._thread.start()
+
+    def start(self, animal_ids, level, *args, **kwargs):
+        """Prepare `level` in the background; arguments are prepare()'s"""
+        self.cancel()
+        future = Future()
+        with self._cond:
+            self._job = ((animal_ids, level) + args, kwargs), future
+            self._cond.notify()
+        self._pending = level, future
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._job is None:
+                    self._cond.wait()
+                ((args, kwargs), future), self._job = self._job, None
+            if not future.set_running_or_notify_cancel():
+                continue  # cancelled before it started
+            try:
+                future.set_result(prepare(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+
+    def take(self, level):
+        """The prepared LevelPlan for `level`, waiting for it if it is still being dealt, or
+        None if a different level (or nothing) was prefetched"""
+        if self._pending is None or self._pending[0] != level:
+            return None
+        (_, future), self._pending = self._pending, None
+        return future.result()
+
+    def cancel(self):
+        if self._pending:
+            self._pending[1].cancel()  # a deal already running just finishes unused
+            self._pending = None
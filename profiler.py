@@ -0,0 +1,200 @@
+"""Opt-in per-phase frame profiler.
+
+Code marks phases with `with PROFILER.phase('name'):` and bumps counters with
+PROFILER.count('name', n). Each frame (begin_frame()/end_frame()) becomes one record of
+phase times in ms and counter values; the last WINDOW records back the percentiles shown
+in the overlay. With an export path set, records are flushed every EXPORT_EVERY frames:
+`.csv` appends one row per frame, phase or counter, `.json` rewrites a summary.
+
+Disabled (the default) phase() hands back a shared no-op context manager and count() returns
+at once, so instrumented code costs a method call. Hot loops should test PROFILER.enabled
+before counting.
+
+    python profiler.py profile.csv        summarize an exported CSV
+"""
+import collections
+import csv
+import json
+import os
+import sys
+import time
+
+from atomic_write import atomic_write
+
+WINDOW = 600  # frames kept for percentiles, about ten seconds at 60 FPS
+EXPORT_EVERY = 120
+PERCENTILES = (50, 95, 99)
+
+
+class _NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        times = self.profiler.times
+        times[self.name] = times.get(self.name, 0.0) + (time.perf_counter() - self.start) * 1e3
+        return False
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of a non-empty sequence"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+
+class Profiler:
+    def __init__(self, enabled=False, window=WINDOW, export_path=None, export_every=EXPORT_EVERY):
+        self.enabled = enabled
+        self.export_path = export_path
+        self.export_every = export_every
+        self.history = collections.deque(maxlen=window)
+        self.pending = []
+        self.frame = 0
+        self.times = {}
+        self.counters = collections.Counter()
+        self._frame_start = None
+
+    def phase(self, name):
+        return _Phase(self, name) if self.enabled else _NULL_PHASE
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] += n
+
+    def begin_frame(self):
+        if self.enabled:
+            self._frame_start = time.perf_counter()
+
+    def end_frame(self):
+        """Close the current frame's record; work outside begin/end_frame (e.g. waiting for
+        the next tick) is not part of the frame time"""
+        if not self.enabled or self._frame_start is None:
+            return
+        record = {'frame': self.frame, 'time': time.time(),
+                  'frame_ms': (time.perf_counter() - self._frame_start) * 1e3,
+                  'phases': self.times, 'counters': dict(self.counters)}
+        self.history.append(record)
+        self.frame += 1
+        self.times, self.counters, self._frame_start = {}, collections.Counter(), None
+        if self.export_path:
+            self.pending.append(record)
+            if len(self.pending) >= self.export_every:
+                self.flush()
+
+    def reset(self):
+        self.history.clear()
+        self.pending.clear()
+        self.times, self.counters, self._frame_start = {}, collections.Counter(), None
+
+    def summary(self):
+        """{'frame_ms': {...}, 'phases': {name: {...}}, 'counters': {name: {...}}} over the window,
+        each with percentiles (per frame, frames without the phase count as 0) and the mean"""
+        frames = list(self.history)
+        if not frames:
+            return {'frames': 0, 'frame_ms': {}, 'phases': {}, 'counters': {}}
+
+        def stats(values):
+            out = {f'p{p}': percentile(values, p) for p in PERCENTILES}
+            out['mean'] = sum(values) / len(values)
+            return out
+
+        phases = sorted({name for r in frames for name in r['phases']})
+        counters = sorted({name for r in frames for name in r['counters']})
+        return {
+            'frames': len(frames),
+            'frame_ms': stats([r['frame_ms'] for r in frames]),
+            'phases': {name: stats([r['phases'].get(name, 0.0) for r in frames]) for name in phases},
+            'counters': {name: stats([r['counters'].get(name, 0) for r in frames]) for name in counters},
+        }
+
+    def lines(self):
+        """Summary as short text lines for the on-screen overlay"""
+        s = self.summary()
+        if not s['frames']:
+            return ['profiler: no frames yet']
+        head = '  '.join(f'p{p}' for p in PERCENTILES)
+        out = [f"{s['frames']} frames  ms {head}"]
+
+        def row(name, st, fmt):
+            return f'{name:<14}' + ''.join(f" {st[f'p{p}']:{fmt}}" for p in PERCENTILES)
+
+        out.append(row('frame', s['frame_ms'], '6.2f'))
+        out += [row(name, st, '6.2f') for name, st in s['phases'].items()]
+        out += [row(name, st, '6.0f') for name, st in s['counters'].items()]
+        return out
+
+    def flush(self):
+        """Write pending records to export_path. A failing write is dropped, never raised
+        into the game loop."""
+        if not self.export_path:
+            return
+        try:
+            if self.export_path.endswith('.json'):
+                with atomic_write(self.export_path) as f:
+                    json.dump(self.summary(), f, indent=1)
+            else:
+                new = not os.path.exists(self.export_path)
+                with open(self.export_path, 'a', newline='') as f:
+                    writer = csv.writer(f)
+                    if new:
+                        writer.writerow(('frame', 'time', 'kind', 'name', 'value'))
+                    for r in self.pending:
+                        writer.writerow((r['frame'], f"{r['time']:.3f}", 'frame', 'frame_ms', f"{r['frame_ms']:.3f}"))
+                        for name, ms in r['phases'].items():
+                            writer.writerow((r['frame'], f"{r['time']:.3f}", 'phase', name, f'{ms:.3f}'))
+                        for name, n in r['counters'].items():
+                            writer.writerow((r['frame'], f"{r['time']:.3f}", 'counter', name, n))
+        except OSError:
+            pass
+        self.pending.clear()
+
+
+PROFILER = Profiler()
+
+
+def load_csv(path):
+    """Read an exported CSV back into a Profiler holding its records, for summarizing"""
+    frames = {}
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            # frame numbers restart with every session appended to the file
+            r = frames.setdefault((row['frame'], row['time']), {
+                'frame': int(row['frame']), 'time': float(row['time']),
+                'frame_ms': 0.0, 'phases': {}, 'counters': {}})
+            if row['kind'] == 'frame':
+                r['frame_ms'] = float(row['value'])
+            elif row['kind'] == 'phase':
+                r['phases'][row['name']] = float(row['value'])
+            else:
+                r['counters'][row['name']] = int(row['value'])
+    profiler = Profiler(window=len(frames) or 1)
+    profiler.history.extend(frames.values())
+    return profiler
+
+
+def main(argv):
+    if len(argv) != 2:
+        sys.exit(__doc__)
+    print('\n'.join(load_csv(argv[1]).lines()))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,204 @@
+"""Retained-mode drawing for the level screen.
+
+The background and the tiles are composited once into an off-screen surface and only the
+cells that change are repainted into it. Everything that sits on top (time bar, lives,
+selection, hint) is an overlay identified by a key; a frame only uploads the rectangles of
+repainted cells and of overlays that appeared, disappeared or changed their key.
+
+Tiles come from a texture atlas, so repainting cells and drawing tile overlays are each a
+single batched Surface.blits call. Boards too large for the window are shown through a
+scrolling, zoomable viewport, and only its cells are ever looked at.
+"""
+import collections
+import os
+import time
+
+import pygame
+
+from profiler import PROFILER
+from surface_cache import load_scaled
+
+
+class RenderCache:
+    """Loaded/scaled images and rendered text shared by every screen, each kept in an LRU.
+    Images are converted to the display format, so a display must exist."""
+    def __init__(self, base_path, max_images=64, max_texts=256):
+        self.base_path = base_path
+        self.max_images = max_images
+        self.max_texts = max_texts
+        self._images = collections.OrderedDict()
+        self._texts = collections.OrderedDict()
+
+    @staticmethod
+    def _lookup(store, key, limit, make):
+        if key in store:
+            store.move_to_end(key)
+            return store[key]
+        value = store[key] = make()
+        if len(store) > limit:
+            store.popitem(last=False)
+        return value
+
+    def image(self, rel_path, size, alpha=True):
+        size = (int(size[0]), int(size[1]))
+        def make():
+            surf = load_scaled(self.base_path, os.path.join(self.base_path, rel_path), size)
+            return surf.convert_alpha() if alpha else surf.convert()
+        return self._lookup(self._images, (rel_path, size, alpha), self.max_images, make)
+
+    def text(self, font, text, colour, antialias=True):
+        return self._lookup(self._texts, (font, text, colour, antialias), self.max_texts,
+                            lambda: font.render(text, antialias, colour))
+
+
+class FrameStats:
+    """Pixels pushed to the display per frame, averaged over roughly a second"""
+    def __init__(self, window_area, period=1.0):
+        self.window_area = window_area
+        self.period = period
+        self.frames = 0
+        self.pixels = 0
+        self.since = time.perf_counter()
+        self.per_frame = 0.0
+
+    def record(self, rects):
+        self.frames += 1
+        self.pixels += sum(r.w * r.h for r in rects)
+        now = time.perf_counter()
+        if now - self.since >= self.period:
+            self.per_frame = self.pixels / self.frames
+            self.frames = self.pixels = 0
+            self.since = now
+
+    def text(self):
+        return f'{self.per_frame:,.0f} px/frame ({self.per_frame / self.window_area:.1%})'
+
+
+class BoardRenderer:
+    """The board inside `view`, a rect of the screen. A board with more cells than fit in
+    the view at the current zoom shows a window of it that scrolls by whole cells; only the
+    cells inside that window are composited, diffed and hit-tested."""
+    def __init__(self, screen, background, tiles, view, box_size, board_size):
+        self.screen = screen
+        self.background = background
+        self.tiles = tiles  # box size -> (atlas, {(animal, tile state): atlas rect}); state 0 is the plain tile
+        self.view = pygame.Rect(view)
+        self.board_size = board_size  # (columns, rows)
+        self.scroll = (0, 0)  # first visible (column, row)
+        self.cols = self.rows = 0  # cells visible across and down
+        self.overlays = {}
+        self.stats = FrameStats(screen.get_width() * screen.get_height())
+        self.set_zoom(box_size)
+        self.dirty = [screen.get_rect()]
+
+    def set_zoom(self, box_size):
+        """Draw tiles `box_size` pixels wide, keeping the cell in the middle of the view there"""
+        middle = self.scroll[0] + self.cols // 2, self.scroll[1] + self.rows // 2
+        self.box_size = box_size
+        self.atlas, self.areas = self.tiles(box_size)
+        self.cols = min(self.board_size[0], self.view.w // box_size)
+        self.rows = min(self.board_size[1], self.view.h // box_size)
+        # a board smaller than the view is centred in it
+        self.origin = (self.view.x + (self.view.w - self.cols*box_size) // 2,
+                       self.view.y + (self.view.h - self.rows*box_size) // 2)
+        self.scroll = None
+        self.scroll_to(middle[0] - self.cols // 2, middle[1] - self.rows // 2)
+
+    def scroll_to(self, col, row):
+        """Make (col, row) the top left visible cell, clamped to the board; False if nothing moved"""
+        scroll = (max(0, min(col, self.board_size[0] - self.cols)),
+                  max(0, min(row, self.board_size[1] - self.rows)))
+        if scroll == self.scroll:
+            return False
+        self.scroll = scroll
+        # everything in the view moves, so start its composite over
+        self.composite = self.background.copy()
+        self.shown = {}
+        self.dirty = [self.view]
+        return True
+
+    def scroll_by(self, cols, rows):
+        return self.scroll_to(self.scroll[0] + cols, self.scroll[1] + rows)
+
+    def center_on(self, y, x):
+        return self.scroll_to(x - self.cols // 2, y - self.rows // 2)
+
+    def visible(self, y, x):
+        return 0 <= x - self.scroll[0] < self.cols and 0 <= y - self.scroll[1] < self.rows
+
+    def cell_rect(self, y, x):
+        return pygame.Rect((x - self.scroll[0])*self.box_size + self.origin[0],
+                           (y - self.scroll[1])*self.box_size + self.origin[1],
+                           self.box_size, self.box_size)
+
+    def cell_at(self, pos):
+        """Board cell (y, x) under a screen position, or None outside the visible cells"""
+        col, row = (pos[0] - self.origin[0]) // self.box_size, (pos[1] - self.origin[1]) // self.box_size
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            return row + self.scroll[1], col + self.scroll[0]
+        return None
+
+    def sprite(self, val, state=0):
+        """(atlas, area) of a tile at the current zoom, for overlays"""
+        return self.atlas, self.areas[val, state]
+
+    def refresh(self, board):
+        """Repaint the visible cells whose tile differs from what the composite currently shows"""
+        batch = []
+        x0, y0 = self.scroll
+        for y in range(y0, y0 + self.rows):
+            row = board.grid[y]
+            for x in range(x0, x0 + self.cols):
+                val = row[x]
+                if self.shown.get((y, x), 0) != val:
+                    rect = self.cell_rect(y, x)
+                    batch.append((self.background, rect, rect))
+                    if val:
+                        batch.append((self.atlas, rect, self.areas[val, 0]))
+                        self.shown[y, x] = val
+                    else:
+                        del self.shown[y, x]
+                    self.dirty.append(rect)
+        if batch:
+            self.composite.blits(batch, doreturn=False)
+            PROFILER.count('blits', len(batch))
+
+    def present(self, overlays):
+        """Draw one frame. `overlays` is a list of (key, rect, draw) where draw is either a
+        (surface, area) sprite or a callable that paints the overlay on the screen. Overlays
+        are painted in list order, consecutive sprites in one batch, and only when their rect
+        has to be uploaded."""
+        current = {key: (pygame.Rect(rect), draw) for key, rect, draw in overlays}
+        dirty = self.dirty
+        dirty.extend(rect for key, (rect, _) in self.overlays.items() if key not in current)
+        dirty.extend(rect for key, (rect, _) in current.items() if key not in self.overlays)
+        self.overlays, self.dirty = current, []
+        if dirty:
+            # Overlays touching the dirty area are redrawn whole, so grow the area to cover
+            # them rather than painting their translucent edges over themselves; that can reach
+            # further overlays, so repeat until nothing else is touched
+            redraw = set()
+            while True:
+                touched = [key for key, (rect, _) in current.items()
+                           if key not in redraw and rect.collidelist(dirty) != -1]
+                if not touched:
+                    break
+                redraw.update(touched)
+                dirty.extend(current[key][0] for key in touched)
+            batch = [(self.composite, rect, rect) for rect in dirty]
+            blits = 0
+            for key, (rect, draw) in current.items():
+                if key not in redraw:
+                    continue
+                if callable(draw):
+                    self.screen.blits(batch, doreturn=False)
+                    blits += len(batch) + 1
+                    batch = []
+                    draw()
+                else:
+                    batch.append((draw[0], rect, draw[1]))
+            self.screen.blits(batch, doreturn=False)
+            PROFILER.count('blits', blits + len(batch))
+            with PROFILER.phase('upload'):
+                pygame.display.update(dirty)
+        self.stats.record(dirty)
@@ -0,0 +1,168 @@
+"""Recorded sessions, replayed headlessly as a correctness and speed benchmark.
+
+With RECORD_SESSION set in main.py the game writes every level it plays to a JSON file: the
+level's seed, board size and class and animal ids (enough to deal the same board again; a
+level resumed from a saved game stores its board_codec encoding instead) and its events,
+each stamped with milliseconds since the level started:
+
+    [t, y, x]                    a click on the tile at (y, x)
+    [t, y, x, crc]               a click that completed a match; crc is checksum() afterwards
+    [t, 'shuffle', seed, crc]    a dead board reshuffled by hint_worker.analyse with `seed`
+
+Replaying deals each board again and feeds it the clicks through Clicks, which mirrors
+run_level's click handling, at full speed with no clock or display, checking the checksum
+after every match and reshuffle. Only the board rules are imported, so this needs no pygame.
+
+    python replay.py session.json [--repeat N]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import zlib
+
+from atomic_write import atomic_write
+from board import ArrayBoard, BOARDS
+import board_codec
+import generator
+import hint_worker
+
+FORMAT = 1
+
+
+def checksum(board):
+    """CRC-32 of the grid, row by row"""
+    return zlib.crc32(board_codec.cells(board))
+
+
+class Clicks:
+    """The level screen's click handling without the screen: the first click selects a tile,
+    clicking it again deselects it and a second tile is matched with it if a path connects
+    them. Returns the path of a match, otherwise None."""
+    def __init__(self, board, level):
+        self.board = board
+        self.level = level
+        self.first = None
+
+    def click(self, y, x):
+        first, self.first = self.first, None
+        if first is None:
+            self.first = (y, x)
+            return None
+        if first == (y, x):
+            return None
+        path = self.board.connect(first[0], first[1], y, x)
+        if path:
+            self.board.remove(first[0], first[1], y, x)
+            self.board.alter(first[0], first[1], y, x, self.level)
+        return path
+
+
+class Recorder:
+    """Collects the levels of one session and rewrites `path` as each one ends"""
+    def __init__(self, path, seed):
+        self.path = path
+        self.session = {'format': FORMAT, 'seed': seed, 'levels': []}
+        self.events = None
+        self.start = 0.0
+
+    def start_level(self, now, level, seed, board, animal_ids, resumed=False):
+        """A resumed board can't be dealt from its seed, so it is stored whole"""
+        self.start = now
+        self.events = []
+        record = {'level': level, 'seed': seed, 'size': [board.width, board.height],
+                  'board': 'array' if isinstance(board, ArrayBoard) else 'list',
+                  'animals': list(animal_ids), 'checksum': checksum(board), 'events': self.events}
+        if resumed:
+            record['start'] = board_codec.encode(board, level).hex()
+        self.session['levels'].append(record)
+
+    def _t(self, now):
+        return int((now - self.start) * 1000)
+
+    def click(self, now, y, x):
+        self.events.append([self._t(now), y, x])
+
+    def matched(self, board):
+        """Stamp the last click, which completed a match, with the board's checksum"""
+        self.events[-1].append(checksum(board))
+
+    def shuffled(self, now, seed, board):
+        self.events.append([self._t(now), 'shuffle', seed, checksum(board)])
+
+    def end_level(self, now, cleared):
+        level = self.session['levels'][-1]
+        level['cleared'] = cleared
+        level['duration'] = self._t(now)
+        self.save()
+
+    def save(self):
+        with atomic_write(self.path) as f:
+            json.dump(self.session, f, separators=(',', ':'))
+
+
+def deal(record):
+    """The board a recorded level started with"""
+    if 'start' in record:
+        board, _ = board_codec.to_board(bytes.fromhex(record['start']), BOARDS[record['board']],
+                                        random.Random(record['seed']))
+        return board
+    width, height = record['size']
+    return generator.generate(record['animals'], record['level'], width, height,
+                              random.Random(record['seed']), BOARDS[record['board']])
+
+
+def replay_level(record):
+    """Replay one recorded level; returns (moves, mismatches), where mismatches lists the
+    indexes of events whose checksum differs, -1 standing for the dealt board"""
+    board = deal(record)
+    level = record['level']
+    mismatches = [] if checksum(board) == record['checksum'] else [-1]
+    clicks = Clicks(board, level)
+    moves = 0
+    for i, event in enumerate(record['events']):
+        if event[1] == 'shuffle':
+            _, layout = hint_worker.analyse(board.snapshot(), level, event[2])
+            if layout:
+                board.place(layout)  # like the game, this keeps a selected tile selected
+            crc = event[3]
+        else:
+            path = clicks.click(event[1], event[2])
+            crc = event[3] if len(event) > 3 else None
+            moves += bool(path)
+            if bool(path) != (crc is not None):
+                mismatches.append(i)  # one of the recording and the replay matched here
+                continue
+        if crc is not None and checksum(board) != crc:
+            mismatches.append(i)
+    if record.get('cleared') and not board.is_complete():
+        mismatches.append(len(record['events']))
+    return moves, mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('session', help='a file written with RECORD_SESSION')
+    parser.add_argument('--repeat', type=int, default=1, help='replay this many times and keep the fastest')
+    args = parser.parse_args()
+    with open(args.session) as f:
+        session = json.load(f)
+    failed = False
+    print(f"{'level':<7}{'events':>8}{'moves':>7}{'played s':>10}{'replay ms':>11}  result")
+    for record in session['levels']:
+        best = None
+        for _ in range(args.repeat):
+            begin = time.perf_counter()
+            moves, mismatches = replay_level(record)
+            elapsed = time.perf_counter() - begin
+            best = elapsed if best is None else min(best, elapsed)
+        failed = failed or bool(mismatches)
+        result = f'MISMATCH at events {mismatches}' if mismatches else 'ok'
+        print(f"{record['level']:<7}{len(record['events']):>8}{moves:>7}"
+              f"{record.get('duration', 0) / 1000:>10.1f}{best * 1000:>11.1f}  {result}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
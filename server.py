@@ -0,0 +1,208 @@
+"""Matching Animals over a socket: thousands of independent boards served by one asyncio loop.
+
+Every request is one line of space-separated words and gets one line back:
+
+    NEW [level] [seed]           OK <session> <width> <height> <seconds left>
+    BOARD <session>              OK <board_codec encoding, in hex>
+    MOVE <session> y1 x1 y2 x2   OK <tiles left> [SHUFFLED]   a match; like the game it adds
+                                                              a second and reshuffles a dead board
+                                 MISS                         not a connectable pair
+                                 WON                          the board is clear; the session ends
+    HINT <session>               OK y1 x1 y2 x2, or OK NONE
+    SHUFFLE <session>            OK
+    END <session>                OK
+    STATS                        OK <sessions> <moves> <expired>
+
+anything else is answered with ERR and a reason. Sessions belong to the server, not to the
+connection that made them, so a client may hold many and reconnect. A session whose level
+time runs out answers ERR expired once and is dropped; a reaper task drops the ones nobody
+asks about.
+
+    python server.py [--host H] [--port P | --unix PATH] [--seed S]
+"""
+import argparse
+import asyncio
+import inspect
+import itertools
+import random
+import time
+
+import board_codec
+import generator
+from board import ANIMAL_IDS, LEVEL_MAX
+
+HOST = '127.0.0.1'
+PORT = 8765
+LEVEL_TIME = 180  # seconds per board, GAME_TIME in main.py
+MATCH_BONUS = 1  # seconds a match adds
+REAP_EVERY = 5.0  # seconds between sweeps for expired sessions
+
+
+class Reply(Exception):
+    """Raised with the answer for a request that can't go on, e.g. 'ERR expired'"""
+
+
+class Session:
+    __slots__ = ('board', 'level', 'deadline')
+
+    def __init__(self, board, level, deadline):
+        self.board = board
+        self.level = level
+        self.deadline = deadline
+
+
+class GameServer:
+    """The sessions and the protocol; handle() answers one request line and never blocks, so
+    it can be driven without sockets too"""
+    def __init__(self, clock=time.monotonic, seed=None):
+        self.sessions = {}
+        self.clock = clock
+        self.rng = random.Random(seed)
+        self.ids = itertools.count(1)
+        self.moves = self.expired = 0
+        self.commands = {'NEW': self.new, 'BOARD': self.show, 'MOVE': self.move, 'HINT': self.hint,
+                         'SHUFFLE': self.shuffle, 'END': self.end, 'STATS': self.stats}
+
+    def handle(self, line):
+        words = line.split()
+        if not words:
+            return 'ERR empty request'
+        command = self.commands.get(words[0].upper())
+        if command is None:
+            return f'ERR unknown command {words[0]}'
+        try:
+            args = [int(w) for w in words[1:]]
+        except ValueError:
+            return 'ERR arguments must be integers'
+        try:
+            inspect.signature(command).bind(*args)
+        except TypeError:
+            return f'ERR wrong number of arguments for {words[0].upper()}'
+        try:
+            return command(*args)
+        except Reply as e:
+            return str(e)
+
+    def session(self, sid):
+        """The live session `sid`; raises Reply for anything else"""
+        session = self.sessions.get(sid)
+        if session is None:
+            raise Reply('ERR no such session')
+        if self.clock() >= session.deadline:
+            del self.sessions[sid]
+            self.expired += 1
+            raise Reply('ERR expired')
+        return session
+
+    def new(self, level=1, seed=None):
+        if not 1 <= level <= LEVEL_MAX:
+            return f'ERR level must be 1 to {LEVEL_MAX}'
+        rng = random.Random(self.rng.getrandbits(64) if seed is None else seed)
+        board = generator.generate(ANIMAL_IDS, level, rng=rng)
+        sid = next(self.ids)
+        self.sessions[sid] = Session(board, level, self.clock() + LEVEL_TIME)
+        return f'OK {sid} {board.width} {board.height} {LEVEL_TIME}'
+
+    def show(self, sid):
+        session = self.session(sid)
+        return f'OK {board_codec.encode(session.board, session.level).hex()}'
+
+    def move(self, sid, y1, x1, y2, x2):
+        session = self.session(sid)
+        board = session.board
+        if not all(0 <= y < board.height and 0 <= x < board.width for y, x in ((y1, x1), (y2, x2))):
+            return 'ERR cell off the board'
+        if (y1, x1) == (y2, x2) or not board.grid[y1][x1] or not board.connect(y1, x1, y2, x2):
+            return 'MISS'
+        board.remove(y1, x1, y2, x2)
+        board.alter(y1, x1, y2, x2, session.level)
+        self.moves += 1
+        session.deadline += MATCH_BONUS
+        if board.is_complete():
+            del self.sessions[sid]
+            return 'WON'
+        if not board.has_moves():
+            generator.reshuffle(board, session.level)
+            return f'OK {len(board.tiles())} SHUFFLED'
+        return f'OK {len(board.tiles())}'
+
+    def hint(self, sid):
+        session = self.session(sid)
+        hint = session.board.get_hint()
+        return f'OK {hint[0][0]} {hint[0][1]} {hint[1][0]} {hint[1][1]}' if hint else 'OK NONE'
+
+    def shuffle(self, sid):
+        session = self.session(sid)
+        generator.reshuffle(session.board, session.level)
+        return 'OK'
+
+    def end(self, sid):
+        self.session(sid)
+        del self.sessions[sid]
+        return 'OK'
+
+    def stats(self):
+        return f'OK {len(self.sessions)} {self.moves} {self.expired}'
+
+    def reap(self):
+        """Drop every session whose time is up"""
+        now = self.clock()
+        for sid in [sid for sid, s in self.sessions.items() if now >= s.deadline]:
+            del self.sessions[sid]
+            self.expired += 1
+
+    async def client(self, reader, writer):
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:  # over the stream limit; the rest of the line can't be trusted
+                    writer.write(b'ERR line too long\n')
+                    break
+                if not line:
+                    break
+                reply = self.handle(line.decode('ascii', 'replace'))
+                writer.write(reply.encode('ascii', 'replace') + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def reaper(self):
+        while True:
+            await asyncio.sleep(REAP_EVERY)
+            self.reap()
+
+    async def serve(self, host=HOST, port=PORT, unix=None, ready=None):
+        """Serve until cancelled; `ready` (an asyncio.Event) is set once connections are accepted"""
+        if unix:
+            server = await asyncio.start_unix_server(self.client, unix)
+        else:
+            server = await asyncio.start_server(self.client, host, port)
+        reaper = asyncio.ensure_future(self.reaper())
+        if ready:
+            ready.set()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            reaper.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--unix', help='listen on this unix socket instead')
+    parser.add_argument('--seed', type=int, help='seed for boards dealt without one')
+    args = parser.parse_args()
+    print(f'serving on {args.unix or f"{args.host}:{args.port}"}', flush=True)
+    try:
+        asyncio.run(GameServer(seed=args.seed).serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
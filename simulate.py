@@ -0,0 +1,147 @@
+"""Headless simulation: play many games on the board rules alone.
+
+    python simulate.py [--games N] [--policy greedy|random] [--board list|array] [--deal random|solvable]
+                       [--workers W] [--seed S] [--corpus PATH]
+
+With --corpus the games are played on boards from a board_codec corpus file, each at the level
+stored with it, instead of freshly dealt ones: boards N from --seed on.
+
+Only the board rules (board.py, generator.py) are imported, so this needs no pygame,
+display or audio device.
+"""
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import generator
+from board import ANIMAL_IDS, Board, BOARDS, LEVEL_MAX
+from board_codec import CorpusReader
+
+MAX_SHUFFLES = 20  # give a game up after this many dead boards in a row
+
+
+def greedy(board, rng):
+    """Take whatever the hint would show"""
+    return board.get_hint()
+
+
+def random_pair(board, rng):
+    """Any connectable pair, uniformly"""
+    return list(rng.choice(sorted(board.moves.pairs)))
+
+
+POLICIES = {'greedy': greedy, 'random': random_pair}
+
+
+def play(seed, level, policy='greedy', board_cls=Board, solvable=False):
+    """Play one game to the end, shuffling dead boards like run_level does"""
+    rng = random.Random(seed)
+    board = board_cls(ANIMAL_IDS, rng=rng)
+    if solvable:
+        generator.make_solvable(board, level)
+    return play_board(board, level, rng, policy, solvable)
+
+
+def play_board(board, level, rng, policy='greedy', solvable=False):
+    choose = POLICIES[policy]
+    moves = shuffles = streak = 0
+    while not board.is_complete():
+        if not board.has_moves():
+            if streak == MAX_SHUFFLES:
+                break
+            if solvable:
+                generator.reshuffle(board, level)
+            else:
+                board.shuffle_board()
+            shuffles += 1; streak += 1
+            continue
+        (y1, x1), (y2, x2) = choose(board, rng)
+        board.remove(y1, x1, y2, x2)
+        board.alter(y1, x1, y2, x2, level)
+        moves += 1; streak = 0
+    return level, moves, shuffles, board.is_complete()
+
+
+def play_batch(job):
+    seeds, level, policy, board_name, deal = job
+    return [play(seed, level, policy, BOARDS[board_name], deal == 'solvable') for seed in seeds]
+
+
+_corpora = {}  # path -> CorpusReader, mapped once per worker process
+
+
+def play_corpus_batch(job):
+    path, indexes, policy, board_name, deal = job
+    if path not in _corpora:
+        _corpora[path] = CorpusReader(path)
+    corpus = _corpora[path]
+    results = []
+    for i in indexes:
+        rng = random.Random(i)
+        board, level = corpus.board(i, BOARDS[board_name], rng)
+        results.append(play_board(board, level, rng, policy, deal == 'solvable'))
+    return results
+
+
+def simulate(games, policy='greedy', board_name='list', deal='random', workers=None, seed=0, chunk=50,
+             corpus=None):
+    """Play `games` seeds on every level, or `games` boards of `corpus`, across a process pool;
+    returns (results, seconds)"""
+    if corpus:
+        with CorpusReader(corpus) as boards:
+            end = min(seed + games, len(boards))
+        run = play_corpus_batch
+        jobs = [(corpus, range(start, min(start + chunk, end)), policy, board_name, deal)
+                for start in range(seed, end, chunk)]
+    else:
+        run = play_batch
+        jobs = [(range(start, min(start + chunk, seed + games)), level, policy, board_name, deal)
+                for level in range(1, LEVEL_MAX + 1)
+                for start in range(seed, seed + games, chunk)]
+    begin = time.perf_counter()
+    results = run_batches(run, jobs, workers)
+    return results, time.perf_counter() - begin
+
+
+def run_batches(run, jobs, workers=None):
+    """run(job) for every job, across a process pool or in-process with workers == 1; the
+    batches' results joined in job order"""
+    if workers == 1:
+        return [r for job in jobs for r in run(job)]
+    with ProcessPoolExecutor(workers) as pool:
+        return [r for batch in pool.map(run, jobs) for r in batch]
+
+
+def report(results, seconds):
+    print(f"{'level':<7}{'games':>7}{'avg moves':>11}{'shuffles/game':>15}{'dead %':>8}{'cleared %':>11}")
+    for level in range(1, LEVEL_MAX + 1):
+        rows = [r for r in results if r[0] == level]
+        if not rows:
+            continue
+        n = len(rows)
+        moves = sum(r[1] for r in rows) / n
+        shuffles = sum(r[2] for r in rows) / n
+        dead = sum(1 for r in rows if r[2]) / n * 100
+        cleared = sum(1 for r in rows if r[3]) / n * 100
+        print(f'{level:<7}{n:>7}{moves:>11.1f}{shuffles:>15.2f}{dead:>8.1f}{cleared:>11.1f}')
+    print(f'{len(results)} games in {seconds:.2f}s, {len(results) / seconds:.0f} games/s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--games', type=int, default=1000, help='games per level, or in all with --corpus')
+    parser.add_argument('--policy', choices=POLICIES, default='greedy')
+    parser.add_argument('--board', choices=BOARDS, default='list')
+    parser.add_argument('--deal', choices=('random', 'solvable'), default='random')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='1 plays in-process')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--corpus', help='play boards from this board_codec corpus')
+    args = parser.parse_args()
+    report(*simulate(args.games, args.policy, args.board, args.deal, args.workers, args.seed,
+                     corpus=args.corpus))
+
+
+if __name__ == '__main__':
+    main()
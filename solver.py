@@ -0,0 +1,263 @@
+"""Exhaustive solver: can a board be cleared under a level's gravity rule, and how hard is it.
+
+Depth-first search over removal orders. States are Zobrist-hashed (XOR of a random key per
+cell and animal, updated only for the cells a move touches) and states proven dead are kept
+in a bounded transposition table, so removal orders that reach the same grid are searched
+once; states on a found solution are kept as winnable too, which is what makes grading
+cheap. Moves that complete an animal go first. On level 1, where removing tiles can only open
+paths, connectable last pairs are taken without branching.
+
+A solved board is graded by walking its solution: at each step every other move is checked
+for still being winnable, and the difficulty adds log10(moves / winnable moves) over the
+steps. That is -log10 of the chance that picking uniformly among the available moves keeps the
+board winnable at every step, estimated along the one solution found rather than over every
+state random play could reach.
+
+    python solver.py [--boards N] [--level L] [--deal random|solvable] [--workers W] [--seed S]
+                     [--max-nodes N] [--csv PATH]
+"""
+import argparse
+import collections
+import csv
+import itertools
+import math
+import os
+import random
+import time
+
+import generator
+from board import ANIMAL_IDS, Board, LEVEL_MAX
+from simulate import run_batches
+
+MAX_NODES = 200000  # states expanded before a search gives up undecided
+TABLE_SIZE = 200000  # decided states remembered
+GRADE_NODES = 300  # budget for each alternative checked while grading
+ZOBRIST_SEED = 0x5eed
+
+# solvable is True, False or None when the node budget ran out first; difficulty is None
+# unless solved, moves is the removal order as ((y1, x1), (y2, x2)) pairs
+Result = collections.namedtuple('Result', 'solvable moves nodes dead_ends branching difficulty')
+
+
+class Solver:
+    def __init__(self, board, level, max_nodes=MAX_NODES, table_size=TABLE_SIZE):
+        # searched on a private list-backed copy; the caller's board is never touched
+        self.board = Board.from_grid(board.snapshot(), random.Random(0))
+        self.level = level
+        self.max_nodes = max_nodes
+        self.table_size = table_size
+        self.table = collections.OrderedDict()  # Zobrist hash -> winnable, least recently hit first
+        self.keys = {}
+        self.keygen = random.Random(ZOBRIST_SEED)
+        self.hash = 0
+        self.tiles = 0
+        for cell, val in self.board.tiles():
+            self.hash ^= self._key(cell, val)
+            self.tiles += 1
+        self.nodes = 0
+        self.exhausted = False
+
+    def _key(self, cell, val):
+        key = self.keys.get((cell, val))
+        if key is None:
+            key = self.keys[cell, val] = self.keygen.getrandbits(64)
+        return key
+
+    def moves(self, prune=True):
+        """Connectable pairs, those completing an animal first. With `prune` on level 1 a single
+        connectable last pair is returned alone: taking it can't block anything."""
+        groups = collections.defaultdict(list)
+        for cell, val in self.board.tiles():
+            groups[val].append(cell)
+        out = []
+        for val, cells in sorted(groups.items(), key=lambda g: len(g[1])):
+            for a, b in itertools.combinations(cells, 2):
+                if self.board._route(*a, *b):
+                    if prune and self.level == 1 and len(cells) == 2:
+                        return [(a, b)]
+                    out.append((a, b))
+        return out
+
+    def play(self, a, b):
+        """Make a move and return what undo() needs to take it back"""
+        (y1, x1), (y2, x2) = a, b
+        grid = self.board.grid
+        before = [((y, x), grid[y][x]) for y, x in self.board.touched(y1, x1, y2, x2, self.level)]
+        undo = (self.hash, before)
+        self.board.remove(y1, x1, y2, x2)
+        self.board.alter(y1, x1, y2, x2, self.level)
+        for (y, x), old in before:
+            new = grid[y][x]
+            if new != old:
+                if old: self.hash ^= self._key((y, x), old)
+                if new: self.hash ^= self._key((y, x), new)
+        self.tiles -= 2
+        return undo
+
+    def undo(self, undo):
+        self.hash, before = undo
+        for (y, x), val in before:
+            self.board.grid[y][x] = val
+        self.tiles += 2
+
+    def solve(self):
+        """Removal order clearing the board, or None. `exhausted` tells an unsolvable board
+        (False) from one the budget couldn't decide (True)."""
+        path = []
+        return path[::-1] if self._search(path) else None
+
+    def _search(self, path):
+        """Whether the current state can be cleared, appending the solution to `path` last move
+        first. Depth-first with an explicit stack: a big board's solution is deeper than
+        Python's recursion limit."""
+        stack = []  # [moves, index of the one being tried, its undo] for each state expanded
+        found = self._visit()
+        while True:
+            if found is None:
+                self.nodes += 1
+                stack.append([self.moves(), -1, None])
+            elif not stack:
+                return found
+            else:
+                frame = stack[-1]
+                self.undo(frame[2])
+                if found:
+                    path.append(frame[0][frame[1]])
+                    self._remember(True)
+                    stack.pop()
+                    continue
+                if self.exhausted:
+                    stack.pop()  # undecided, so this state mustn't be remembered as dead
+                    continue
+            frame = stack[-1]
+            frame[1] += 1
+            if frame[1] == len(frame[0]):
+                self._remember(False)
+                stack.pop()
+                found = False
+                continue
+            frame[2] = self.play(*frame[0][frame[1]])
+            found = self._visit()
+
+    def _visit(self):
+        """What is known about the state just reached: True or False, or None if it still has to
+        be expanded"""
+        if not self.tiles:
+            return True
+        known = self.table.get(self.hash)
+        if known is not None:
+            self.table.move_to_end(self.hash)
+            return known
+        if self.nodes >= self.max_nodes:
+            self.exhausted = True
+            return False
+        return None
+
+    def _remember(self, winnable):
+        self.table[self.hash] = winnable
+        if len(self.table) > self.table_size:
+            self.table.popitem(last=False)
+
+    def winnable(self, max_nodes):
+        """Whether the current state can still be cleared, within a fresh node budget; an
+        undecided state counts as winnable"""
+        self.nodes, self.max_nodes, self.exhausted = 0, max_nodes, False
+        return self._search([]) or self.exhausted
+
+    def grade(self, grade_nodes=GRADE_NODES):
+        """Solve, then score the solution. branching is the mean number of moves available
+        along it; difficulty is sum(log10(moves / winning moves)) over its steps."""
+        moves = self.solve()
+        nodes, solvable = self.nodes, None if self.exhausted else moves is not None
+        if not moves:
+            return Result(solvable, moves, nodes, self.dead_ends(), None, None)
+        branching, difficulty, undos = [], 0.0, []
+        for a, b in moves:
+            options = self.moves(prune=False)
+            winning = 1  # the solution's own move
+            for alt in options:
+                if alt == (a, b):
+                    continue
+                undo = self.play(*alt)
+                winning += self.winnable(grade_nodes)
+                self.undo(undo)
+            branching.append(len(options))
+            difficulty += math.log10(len(options) / winning)
+            undos.append(self.play(a, b))
+        for undo in reversed(undos):
+            self.undo(undo)
+        return Result(True, moves, nodes, self.dead_ends(), sum(branching) / len(branching), difficulty)
+
+    def dead_ends(self):
+        """Dead states found so far, as far as the table still remembers"""
+        return sum(1 for winnable in self.table.values() if not winnable)
+
+
+def solve_seed(seed, level, deal='random', max_nodes=MAX_NODES):
+    """Deal the board simulate.py and the game would deal for `seed` and grade it"""
+    rng = random.Random(seed)
+    board = Board(ANIMAL_IDS, rng=rng)
+    if deal == 'solvable':
+        generator.make_solvable(board, level)
+    return seed, level, Solver(board, level, max_nodes).grade()
+
+
+def solve_batch(job):
+    seeds, level, deal, max_nodes = job
+    return [solve_seed(seed, level, deal, max_nodes) for seed in seeds]
+
+
+def solve_many(boards, levels, deal='random', workers=None, seed=0, max_nodes=MAX_NODES, chunk=10):
+    """Grade `boards` seeds on each level across a process pool; returns (rows, seconds)
+    where rows are (seed, level, Result)"""
+    jobs = [(range(start, min(start + chunk, seed + boards)), level, deal, max_nodes)
+            for level in levels
+            for start in range(seed, seed + boards, chunk)]
+    begin = time.perf_counter()
+    rows = run_batches(solve_batch, jobs, workers)
+    return rows, time.perf_counter() - begin
+
+
+def report(rows, seconds):
+    print(f"{'level':<7}{'boards':>7}{'solvable %':>12}{'unknown %':>11}{'avg nodes':>11}{'branching':>11}{'difficulty':>12}")
+    for level in sorted({level for _, level, _ in rows}):
+        results = [r for _, lv, r in rows if lv == level]
+        n = len(results)
+        solved = [r for r in results if r.solvable]
+        unknown = sum(1 for r in results if r.solvable is None)
+        nodes = sum(r.nodes for r in results) / n
+        branching = sum(r.branching for r in solved) / len(solved) if solved else 0.0
+        difficulty = sum(r.difficulty for r in solved) / len(solved) if solved else 0.0
+        print(f'{level:<7}{n:>7}{len(solved) / n * 100:>12.1f}{unknown / n * 100:>11.1f}'
+              f'{nodes:>11.0f}{branching:>11.2f}{difficulty:>12.2f}')
+    print(f'{len(rows)} boards in {seconds:.2f}s')
+
+
+def write_csv(rows, path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(('seed', 'level', 'solvable', 'length', 'nodes', 'dead_ends', 'branching', 'difficulty'))
+        for seed, level, r in rows:
+            writer.writerow((seed, level, r.solvable, len(r.moves) if r.moves else '', r.nodes, r.dead_ends,
+                             f'{r.branching:.3f}' if r.branching else '', f'{r.difficulty:.3f}' if r.solvable else ''))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--boards', type=int, default=100, help='seeds per level')
+    parser.add_argument('--level', type=int, choices=range(1, LEVEL_MAX + 1), help='only this level')
+    parser.add_argument('--deal', choices=('random', 'solvable'), default='random')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='1 solves in-process')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-nodes', type=int, default=MAX_NODES)
+    parser.add_argument('--csv', help='also write one row per board here')
+    args = parser.parse_args()
+    levels = [args.level] if args.level else range(1, LEVEL_MAX + 1)
+    rows, seconds = solve_many(args.boards, levels, args.deal, args.workers, args.seed, args.max_nodes)
+    report(rows, seconds)
+    if args.csv:
+        write_csv(rows, args.csv)
+
+
+if __name__ == '__main__':
+    main()
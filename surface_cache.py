@@ -0,0 +1,103 @@
+"""On-disk cache of decoded, pre-scaled images.
+
+Decoding PNG/JPEG and scaling them is the bulk of startup and gives the same pixels every
+launch. load_scaled() keeps the raw scaled pixels under CACHE_DIR, keyed by the source file
+(path, size and mtime) and the target size, and maps them straight back into a Surface on
+later runs. Missing or stale entries are rebuilt transparently.
+
+    python surface_cache.py warm [GAME_PATH]    build every entry the game needs
+    python surface_cache.py clear [GAME_PATH]   delete the cache
+"""
+import hashlib
+import mmap
+import os
+import shutil
+import struct
+import sys
+
+import pygame
+
+from atomic_write import atomic_write
+
+CACHE_DIR = '.surface_cache'
+VERSION = 1
+HEADER = struct.Struct('<4sII4s')  # magic, width, height, pixel format
+MAGIC = b'MASC'
+
+
+def cache_dir(base_path):
+    return os.path.join(base_path, CACHE_DIR)
+
+
+def entry_path(base_path, path, size):
+    st = os.stat(path)
+    key = f'{VERSION}|{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}|{size[0]}x{size[1]}'
+    name = hashlib.sha1(key.encode()).hexdigest()
+    return os.path.join(cache_dir(base_path), name + '.raw')
+
+
+def load_scaled(base_path, path, size):
+    """pygame.transform.scale(pygame.image.load(path), size), served from the cache when possible.
+    The surface is not converted to the display format; callers convert once a display exists."""
+    size = (int(size[0]), int(size[1]))
+    entry = entry_path(base_path, path, size)
+    surf = _read(entry, size)
+    if surf is None:
+        surf = pygame.transform.scale(pygame.image.load(path), size)
+        _write(entry, surf)
+    return surf
+
+
+def _read(entry, size):
+    try:
+        with open(entry, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):  # missing, unreadable or empty
+        return None
+    if len(mm) < HEADER.size:
+        return None
+    magic, w, h, fmt = HEADER.unpack_from(mm)
+    fmt = fmt.rstrip(b'\0').decode()
+    if magic != MAGIC or (w, h) != size or len(mm) != HEADER.size + w * h * len(fmt):
+        return None
+    # The surface keeps a reference to the mapping, so the pixels are paged in on demand
+    return pygame.image.frombuffer(memoryview(mm)[HEADER.size:], size, fmt)
+
+
+def _write(entry, surf):
+    fmt = 'RGBA' if surf.get_flags() & pygame.SRCALPHA else 'RGB'
+    try:
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        with atomic_write(entry, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, surf.get_width(), surf.get_height(), fmt.encode()))
+            f.write(pygame.image.tobytes(surf, fmt))
+    except OSError:  # read-only install or full disk: the cache is only an optimization
+        pass
+
+
+def warm(base_path, specs):
+    """Build the entries for an iterable of (image path, size); returns how many were missing"""
+    built = 0
+    for path, size in specs:
+        size = (int(size[0]), int(size[1]))
+        entry = entry_path(base_path, path, size)
+        if _read(entry, size) is None:
+            _write(entry, pygame.transform.scale(pygame.image.load(path), size))
+            built += 1
+    return built
+
+
+def main(argv):
+    if len(argv) < 2 or argv[1] not in ('warm', 'clear'):
+        sys.exit(__doc__)
+    base_path = argv[2] if len(argv) > 2 else os.path.dirname(os.path.abspath(__file__))
+    if argv[1] == 'clear':
+        shutil.rmtree(cache_dir(base_path), ignore_errors=True)
+        return
+    from main import image_specs
+    specs = image_specs(base_path)
+    print(f'{warm(base_path, specs)} of {len(specs)} images (re)built in {cache_dir(base_path)}')
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,74 @@
+"""The line-scan connector against the old BFS, and the incremental move index against a
+full rebuild on every level's gravity rule."""
+import itertools
+import random
+
+import pytest
+
+from board import ANIMAL_IDS, Board, LEVEL_MAX
+
+
+def random_grid(rng, width=10, height=7):
+    """A sparse grid of a few animals, so paths of every shape and plenty of dead ends occur"""
+    density = rng.uniform(0.2, 0.7)
+    return [[rng.randint(1, 4) if rng.random() < density else 0 for _ in range(width)]
+            for _ in range(height)]
+
+
+def turns(path):
+    steps = [(b[0] - a[0], b[1] - a[1]) for a, b in zip(path, path[1:])]
+    return sum(1 for s, t in zip(steps, steps[1:]) if s != t)
+
+
+def test_route_matches_bfs(board_cls):
+    rng = random.Random(0)
+    for _ in range(300):
+        b = board_cls.from_grid(random_grid(rng))
+        tiles = b.tiles()
+        for (a, val), (c, other) in itertools.combinations(tiles, 2):
+            if val != other or rng.random() > 0.3:
+                continue
+            fast, slow = b._route(*a, *c), b._bfs(*a, *c)
+            assert bool(fast) == bool(slow), (a, c, b.snapshot())
+            if not fast:
+                continue
+            assert len(fast) == len(slow)
+            assert (fast[0], fast[-1]) == (a, c)
+            assert all(abs(p[0] - q[0]) + abs(p[1] - q[1]) == 1 for p, q in zip(fast, fast[1:]))
+            assert all(0 <= y < b.height and 0 <= x < b.width and not b.grid[y][x] for y, x in fast[1:-1])
+            assert turns(fast) <= 2
+
+
+def test_legacy_bfs_switch(monkeypatch):
+    b = Board.from_grid([[1, 0, 1], [0, 0, 0]])
+    calls = []
+    monkeypatch.setattr(Board, '_bfs', lambda self, *cells: calls.append(cells) or ['bfs'])
+    assert b.connect(0, 0, 0, 2) == [(0, 0), (0, 1), (0, 2)]
+    assert not calls
+    monkeypatch.setattr('board.LEGACY_BFS', True)
+    assert b.connect(0, 0, 0, 2) == ['bfs']
+    assert calls == [(0, 0, 0, 2)]
+
+
+def fresh_pairs(board):
+    return Board.from_grid(board.snapshot()).moves.pairs
+
+
+@pytest.mark.parametrize('level', range(1, LEVEL_MAX + 1))
+def test_incremental_pairs_match_rebuild(board_cls, level):
+    for seed in range(5):
+        rng = random.Random(seed)
+        board = board_cls(ANIMAL_IDS, rng=rng)
+        assert board.moves.pairs == fresh_pairs(board)
+        while board.has_moves():
+            (y1, x1), (y2, x2) = rng.choice(sorted(board.moves.pairs))
+            board.remove(y1, x1, y2, x2)
+            board.alter(y1, x1, y2, x2, level)
+            assert board.moves.pairs == fresh_pairs(board), (seed, board.snapshot())
+
+
+def test_pairs_are_connectable():
+    board = Board(ANIMAL_IDS, rng=random.Random(0))
+    for a, b in board.moves.pairs:
+        assert board.grid[a[0]][a[1]] == board.grid[b[0]][b[1]]
+        assert board.connect(*a, *b)
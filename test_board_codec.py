@@ -0,0 +1,86 @@
+"""Board encodings, saved games and corpus files round-tripping."""
+import random
+
+import pytest
+
+import board_codec
+import generator
+from board import ANIMAL_IDS, Board
+
+
+def dealt(board_cls=Board, level=3, seed=1):
+    board = generator.generate(ANIMAL_IDS, level, rng=random.Random(seed), board_cls=board_cls)
+    cells = [cell for cell, _ in board.tiles()][:10]
+    for a, b in zip(cells[::2], cells[1::2]):  # some holes, so empty cells are covered too
+        board.remove(*a, *b)
+    return board
+
+
+def test_round_trip(board_cls):
+    board = dealt(board_cls)
+    data = board_codec.encode(board, 3)
+    assert len(data) == board_codec.encoded_size(board.width, board.height)
+    copy, level = board_codec.to_board(data, board_cls)
+    assert level == 3
+    assert copy.snapshot() == board.snapshot()
+    assert board_codec.encode(copy, 3) == data
+
+
+def test_decode_rejects_wrong_length():
+    data = board_codec.encode(dealt(), 3)
+    for bad in (data[:-1], data + b'\0', data[:board_codec.HEADER.size], b'ab', b''):
+        with pytest.raises(ValueError):
+            board_codec.decode(bad)
+
+
+def test_save_and_load(tmp_path):
+    path = tmp_path / 'save.bin'
+    board = dealt()
+    board_codec.save_game(path, board, 4, 2, 97.5, 12345)
+    saved = board_codec.load_game(path)
+    assert saved.board.snapshot() == board.snapshot()
+    assert (saved.level, saved.lives, saved.time_left, saved.seed) == (4, 2, 97.5, 12345)
+
+
+@pytest.mark.parametrize('keep', [0, 10, 40, -1])
+def test_load_rejects_truncated_save(tmp_path, keep):
+    path = tmp_path / 'save.bin'
+    board_codec.save_game(path, dealt(), 4, 2, 97.5, 12345)
+    data = path.read_bytes()
+    path.write_bytes(data[:keep])
+    with pytest.raises(ValueError):
+        board_codec.load_game(path)
+
+
+def test_corpus(tmp_path):
+    path = str(tmp_path / 'corpus.bin')
+    board_codec.write_corpus(path, 3, [1, 2], seed=7)
+    board_codec.write_corpus(path, 2, [5], seed=7)  # appends
+    with board_codec.CorpusReader(path) as corpus:
+        assert len(corpus) == 8
+        assert [corpus.level(i) for i in range(len(corpus))] == [1, 1, 1, 2, 2, 2, 5, 5]
+        board, level = corpus.board(-1)
+        assert level == 5
+        assert board_codec.encode(board, level) == bytes(corpus[7])
+        with pytest.raises(IndexError):
+            corpus[8]
+
+
+def test_corpus_rejects_other_sizes(tmp_path):
+    path = str(tmp_path / 'corpus.bin')
+    board_codec.write_corpus(path, 1, [1])
+    with pytest.raises(ValueError):
+        board_codec.CorpusWriter(path, 20, 12)
+
+
+@pytest.mark.parametrize('keep', [0, 3])
+def test_truncated_corpus_header(tmp_path, keep):
+    path = str(tmp_path / 'corpus.bin')
+    board_codec.write_corpus(path, 1, [1])
+    with open(path, 'r+b') as f:
+        f.truncate(keep)
+    with pytest.raises(ValueError):
+        board_codec.CorpusReader(path)
+    if keep:  # an empty file is a new corpus to the writer
+        with pytest.raises(ValueError):
+            board_codec.CorpusWriter(path)
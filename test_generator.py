@@ -0,0 +1,65 @@
+"""Boards dealt by generator.py are cleared by the removal order they were built from."""
+import random
+
+import pytest
+
+import generator
+from board import ANIMAL_IDS, Board, LEVEL_MAX
+
+
+@pytest.fixture
+def orders(monkeypatch):
+    """Every removal order generator.py finds, most recent last"""
+    found = []
+    removal_order = generator.removal_order
+
+    def record(*args):
+        result = removal_order(*args)
+        if result:
+            found.append(result)
+        return result
+    monkeypatch.setattr(generator, 'removal_order', record)
+    return found
+
+
+def clear(board, level, order):
+    """Play the removal order the deal was built from on `board` itself. A placeholder grid,
+    like removal_order's, is moved by the same gravity to follow where each tile went."""
+    cells, pairs = order
+    ids = Board.from_grid([[0] * board.width for _ in range(board.height)])
+    for i, (y, x) in enumerate(cells, start=1):
+        ids.grid[y][x] = i
+    for i, j in pairs:
+        where = {val: cell for cell, val in ids.tiles()}
+        a, b = where[i + 1], where[j + 1]
+        assert board.connect(*a, *b)
+        for grid in (board, ids):
+            grid.remove(*a, *b)
+            grid.alter(*a, *b, level)
+    assert board.is_complete()
+
+
+@pytest.mark.parametrize('level', range(1, LEVEL_MAX + 1))
+def test_make_solvable_deals_clearable_boards(board_cls, level, orders):
+    for seed in range(10):
+        board = board_cls(ANIMAL_IDS, rng=random.Random(seed))
+        animals = sorted(val for _, val in board.tiles())
+        assert generator.make_solvable(board, level)
+        assert sorted(val for _, val in board.tiles()) == animals
+        clear(board, level, orders[-1])
+
+
+@pytest.mark.parametrize('level', range(1, LEVEL_MAX + 1))
+def test_reshuffle_half_played_board(board_cls, level, orders):
+    board = generator.generate(ANIMAL_IDS, level, rng=random.Random(level), board_cls=board_cls)
+    rng = random.Random(0)
+    for _ in range(20):
+        if not board.has_moves():
+            break
+        (y1, x1), (y2, x2) = rng.choice(sorted(board.moves.pairs))
+        board.remove(y1, x1, y2, x2)
+        board.alter(y1, x1, y2, x2, level)
+    del orders[:]
+    assert generator.reshuffle(board, level)
+    assert orders, 'fell back to a plain shuffle'
+    clear(board, level, orders[-1])
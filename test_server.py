@@ -0,0 +1,126 @@
+"""server.GameServer's protocol, driven through handle() with a fake clock, and over a socket."""
+import asyncio
+import socket
+
+import pytest
+
+import board_codec
+import server
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def game(clock):
+    return server.GameServer(clock=clock, seed=1)
+
+
+def new(game, level=1, seed=5):
+    ok, sid, width, height, seconds = game.handle(f'NEW {level} {seed}').split()
+    assert ok == 'OK'
+    assert int(seconds) == server.LEVEL_TIME
+    return int(sid)
+
+
+def board(game, sid):
+    ok, data = game.handle(f'BOARD {sid}').split()
+    assert ok == 'OK'
+    return board_codec.to_board(bytes.fromhex(data))[0]
+
+
+def test_bad_requests(game):
+    assert game.handle('') == 'ERR empty request'
+    assert game.handle('JUMP 1').startswith('ERR unknown command')
+    assert game.handle('BOARD one') == 'ERR arguments must be integers'
+    assert game.handle('MOVE 1 2').startswith('ERR wrong number of arguments')
+    assert game.handle('BOARD 99') == 'ERR no such session'
+    assert game.handle('NEW 9') == f'ERR level must be 1 to {server.LEVEL_MAX}'
+
+
+def test_same_seed_same_board(game):
+    assert board(game, new(game)).snapshot() == board(game, new(game)).snapshot()
+
+
+def test_play_to_the_end(game):
+    sid = new(game, level=3)
+    while True:
+        ok, *hint = game.handle(f'HINT {sid}').split()
+        assert ok == 'OK'
+        if hint == ['NONE']:
+            assert game.handle(f'SHUFFLE {sid}') == 'OK'
+            continue
+        before = board(game, sid)
+        reply = game.handle(f'MOVE {sid} {" ".join(hint)}')
+        if reply == 'WON':
+            break
+        assert reply.split()[:2] == ['OK', str(len(before.tiles()) - 2)]
+    assert game.handle(f'BOARD {sid}') == 'ERR no such session'
+    assert game.handle('STATS').split()[:3] == ['OK', '0', str(game.moves)]
+
+
+def test_misses(game):
+    sid = new(game)
+    tiles = board(game, sid).tiles()
+    (y, x), _ = tiles[0]
+    assert game.handle(f'MOVE {sid} {y} {x} {y} {x}') == 'MISS'
+    assert game.handle(f'MOVE {sid} {y} {x} -1 0') == 'ERR cell off the board'
+    other = next(cell for cell, val in tiles if val != tiles[0][1])
+    assert game.handle(f'MOVE {sid} {y} {x} {other[0]} {other[1]}') == 'MISS'
+
+
+def test_sessions_expire(game, clock):
+    first, second = new(game), new(game)
+    clock.now = server.LEVEL_TIME
+    assert game.handle(f'HINT {first}') == 'ERR expired'
+    assert game.handle(f'HINT {first}') == 'ERR no such session'
+    game.reap()
+    assert game.handle('STATS') == 'OK 0 0 2'
+    assert game.handle(f'END {second}') == 'ERR no such session'
+
+
+def test_a_match_adds_time(game, clock):
+    sid = new(game)
+    _, *hint = game.handle(f'HINT {sid}').split()
+    assert game.handle(f'MOVE {sid} {" ".join(hint)}').startswith('OK')
+    clock.now = server.LEVEL_TIME
+    assert game.handle(f'HINT {sid}').startswith('OK')
+    clock.now = server.LEVEL_TIME + server.MATCH_BONUS
+    assert game.handle(f'HINT {sid}') == 'ERR expired'
+
+
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason='needs unix sockets')
+def test_socket_survives_bad_input(tmp_path):
+    path = str(tmp_path / 'server.sock')
+
+    async def talk():
+        ready = asyncio.Event()
+        serving = asyncio.ensure_future(server.GameServer(seed=1).serve(unix=path, ready=ready))
+        await ready.wait()
+        try:
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(b'NEW 1 5\n\xff\nSTATS\n')
+            replies = [await reader.readline() for _ in range(3)]
+            writer.write(b'X' * 100000 + b'\n')
+            replies += [await reader.readline(), await reader.readline()]
+            writer.close()
+            return replies
+        finally:
+            serving.cancel()
+
+    new, unknown, stats, too_long, closed = asyncio.run(talk())
+    assert new.startswith(b'OK 1 ')
+    assert unknown == b'ERR unknown command ?\n'
+    assert stats == b'OK 1 0 0\n'
+    assert too_long == b'ERR line too long\n'
+    assert closed == b''
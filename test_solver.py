@@ -0,0 +1,48 @@
+"""The exhaustive solver: its solutions clear the board and deadlocks are proven dead."""
+import random
+
+import pytest
+
+import generator
+from board import ANIMAL_IDS, Board, LEVEL_MAX
+from solver import Solver
+
+
+@pytest.mark.parametrize('level', range(1, LEVEL_MAX + 1))
+def test_solution_clears_the_board(level):
+    for seed in range(4):
+        board = generator.generate(ANIMAL_IDS, level, rng=random.Random(seed))
+        before = board.snapshot()
+        moves = Solver(board, level).solve()
+        assert board.snapshot() == before  # searched on a copy
+        assert moves is not None
+        for a, b in moves:
+            assert board.connect(*a, *b)
+            board.remove(*a, *b)
+            board.alter(*a, *b, level)
+        assert board.is_complete()
+
+
+def test_grade_of_a_solved_board():
+    board = generator.generate(ANIMAL_IDS, 2, rng=random.Random(0))
+    result = Solver(board, 2).grade()
+    assert result.solvable is True
+    assert len(result.moves) == len(board.tiles()) // 2
+    assert result.branching >= 1 and result.difficulty >= 0
+
+
+def test_deadlock_is_unsolvable():
+    # The 3s can be matched, but that leaves 1 2 1 2 in one row, where every pair is blocked
+    board = Board.from_grid([[3, 3, 1, 2, 1, 2]])
+    search = Solver(board, 1)
+    assert search.moves() == [((0, 0), (0, 1))]
+    result = search.grade()
+    assert result.solvable is False
+    assert result.moves is None
+    assert result.dead_ends >= 1
+
+
+def test_undecided_within_budget():
+    board = Board(ANIMAL_IDS, rng=random.Random(9))
+    result = Solver(board, 4, max_nodes=5).grade()
+    assert result.solvable is None and result.moves is None
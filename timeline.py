@@ -0,0 +1,66 @@
+"""Timed animations driven by the game loop instead of blocking waits.
+
+A Tween runs for `duration` seconds; every Timeline.update(now) hands each running tween its
+progress t in [0, 1] through on_update and drops it once it has finished. Nothing here sleeps,
+so the loop keeps handling input and pacing frames while animations play.
+
+on_update may return a list of things to draw this frame (the level screen returns renderer
+overlays); update() returns them all concatenated.
+"""
+
+
+def linear(t):
+    return t
+
+
+def ease_out(t):
+    return 1 - (1 - t) * (1 - t)
+
+
+class Tween:
+    __slots__ = ('start', 'duration', 'on_update', 'key', 'easing')
+
+    def __init__(self, start, duration, on_update, key, easing):
+        self.start = start
+        self.duration = duration
+        self.on_update = on_update
+        self.key = key
+        self.easing = easing
+
+    def progress(self, now):
+        if self.duration <= 0:
+            return 1.0
+        return min(1.0, max(0.0, (now - self.start) / self.duration))
+
+
+class Timeline:
+    def __init__(self):
+        self.tweens = []
+
+    def add(self, now, duration, on_update=None, key=None, easing=linear):
+        """Start a tween at `now`. A tween with the same (non-None) key is replaced."""
+        if key is not None:
+            self.cancel(key)
+        tween = Tween(now, duration, on_update, key, easing)
+        self.tweens.append(tween)
+        return tween
+
+    def cancel(self, key):
+        self.tweens = [tw for tw in self.tweens if tw.key != key]
+
+    def update(self, now):
+        """Advance every tween to `now`; returns what their on_update callbacks asked to draw"""
+        out, finished = [], []
+        for tween in list(self.tweens):
+            raw = tween.progress(now)
+            if tween.on_update:
+                out.extend(tween.on_update(tween.easing(raw)) or ())
+            if raw >= 1.0:
+                finished.append(tween)
+        # Callbacks may have added or cancelled tweens, so filter whatever the list is now
+        done = set(map(id, finished))
+        self.tweens = [tw for tw in self.tweens if id(tw) not in done]
+        return out
+
+    def __len__(self):
+        return len(self.tweens)